@@ -0,0 +1,52 @@
+"""Latência do autocomplete de clientes sobre uma base grande.
+
+Uso: python benchmarks/bench_client_directory.py [--clients 100000] [--orders 200000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import warnings
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import PASSWORD, generate, rep_email  # noqa: E402
+
+QUERIES = ['00', '0020', '00200000012', 'Cliente 00', 'Cliente 0123', 'Loja 04', 'loja 099']
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=100000)
+    parser.add_argument('--orders', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    uri = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'clients.db')}"
+    generate(uri, companies=2, reps=4, products=200, clients=args.clients, orders=args.orders, echo=lambda *a: None)
+
+    os.environ['SQLALCHEMY_DATABASE_URI'] = uri
+    os.environ['SQL_INSTRUMENTATION_SAMPLE_RATE'] = '0'
+    warnings.filterwarnings('ignore')
+    from src.main import app
+    app.config['JWT_VERIFY_SUB'] = False
+
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={'email': rep_email(1), 'password': PASSWORD}).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            started = perf_counter()
+            response = client.get('/api/clients/', query_string={'q': query}, headers=headers)
+            timings.append((perf_counter() - started) * 1000)
+        timings.sort()
+        print(f"{query!r:<16} {len(response.get_json()):>3} resultados  "
+              f"p50={timings[len(timings) // 2]:6.2f}ms  p95={timings[int(len(timings) * 0.95)]:6.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
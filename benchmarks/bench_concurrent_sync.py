@@ -0,0 +1,91 @@
+"""Syncs simultâneos criando os mesmos clientes novos: conflitos e vazão.
+
+Várias threads sincronizam ao mesmo tempo lotes cujos pedidos usam os mesmos
+CNPJs ainda inexistentes (novos a cada rodada), e cadastram o mesmo código de
+produto. Conta respostas de erro, pedidos recusados e pedidos por segundo.
+
+Uso: python benchmarks/bench_concurrent_sync.py [--threads 16] [--rounds 20] [--orders 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import warnings
+from collections import Counter
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import PASSWORD, format_cnpj, generate, rep_email  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--orders', type=int, default=5, help='pedidos (CNPJs novos) por lote')
+    parser.add_argument('--db', help='URI de um banco vazio (padrão: SQLite temporário)')
+    args = parser.parse_args()
+
+    uri = args.db or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'concurrent_sync.db')}"
+    generate(uri, companies=1, reps=args.threads, products=50, clients=10, orders=10,
+             max_items=2, echo=lambda *a: None)
+
+    os.environ['SQLALCHEMY_DATABASE_URI'] = uri
+    os.environ['SQL_INSTRUMENTATION_SAMPLE_RATE'] = '0'
+    os.environ['ADMISSION_ENABLED'] = 'false'
+    warnings.filterwarnings('ignore')
+    from src.main import app
+    app.config['JWT_VERIFY_SUB'] = False
+
+    login = app.test_client()
+    tokens = [
+        login.post('/api/auth/login', json={'email': rep_email(n), 'password': PASSWORD}).get_json()['token']
+        for n in range(1, args.threads + 1)
+    ]
+
+    def batch(round_number):
+        return {'orders': [{
+            'client_cnpj': format_cnpj(9 * 10 ** 9 + round_number * 1000 + n),
+            'client_razao_social': f'Cliente novo {round_number}-{n}',
+            'items': [{'code': f'PRD-{p:06d}', 'quantity': {'P': 1, 'M': 1}} for p in range(1, 4)]
+        } for n in range(args.orders)]}
+
+    outcomes = Counter()
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.threads)
+
+    def worker(token):
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+        for round_number in range(args.rounds):
+            barrier.wait()
+            response = client.post('/api/orders/sync', headers=headers, json=batch(round_number))
+            body = response.get_json() or {}
+            product = client.post('/api/catalog/products', headers=headers, json={
+                'code': f'NOVO-{round_number}', 'description': 'Produto concorrente', 'value': 10
+            })
+            with lock:
+                outcomes[f'sync {response.status_code}'] += 1
+                outcomes['pedidos criados'] += body.get('synced_count', 0)
+                outcomes['pedidos recusados'] += body.get('failed_count', 0)
+                outcomes[f'produto {product.status_code}'] += 1
+
+    threads = [threading.Thread(target=worker, args=(token,)) for token in tokens]
+    started = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - started
+
+    for key in sorted(outcomes):
+        print(f'{key:<20}{outcomes[key]:>8}')
+    print(f"{'tempo':<20}{elapsed:>7.1f}s")
+    print(f"{'pedidos/s':<20}{outcomes['pedidos criados'] / elapsed:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
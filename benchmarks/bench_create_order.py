@@ -0,0 +1,74 @@
+"""Latência de criação de um pedido (POST /api/orders/) por quantidade de itens.
+
+Gera um banco com um representante e um catálogo, cria `--requests` pedidos
+para cada tamanho e mostra p50/p95 e o número de comandos SQL por pedido.
+
+Uso: python benchmarks/bench_create_order.py [--sizes 1,30,200] [--requests 100]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import warnings
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import PASSWORD, format_cnpj, generate, rep_email  # noqa: E402
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1,30,200', help='itens por pedido')
+    parser.add_argument('--requests', type=int, default=100, help='pedidos por tamanho')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    uri = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'create_order.db')}"
+    generate(uri, companies=1, reps=1, products=max(sizes), clients=100, orders=1000,
+             max_items=3, echo=lambda *a: None)
+
+    os.environ['SQLALCHEMY_DATABASE_URI'] = uri
+    os.environ['SQL_INSTRUMENTATION_SAMPLE_RATE'] = '0'
+    warnings.filterwarnings('ignore')
+    from sqlalchemy import event
+    from src.main import app
+    from src.models.models import db
+    app.config['JWT_VERIFY_SUB'] = False
+
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: statements.append(1))
+
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={'email': rep_email(1), 'password': PASSWORD}).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    print(f"{'itens':>6}{'p50':>10}{'p95':>10}{'SQL/pedido':>12}")
+    for size in sizes:
+        payload = {
+            'client_cnpj': format_cnpj(2 * 10 ** 9 + 1),
+            'client_razao_social': 'Cliente 1',
+            'payment_method_id': 1,
+            'items': [{'code': f'PRD-{p:06d}', 'quantity': {'P': 1, 'M': 2}} for p in range(1, size + 1)]
+        }
+        client.post('/api/orders/', headers=headers, json=payload)
+        timings = []
+        statements.clear()
+        for _ in range(args.requests):
+            started = perf_counter()
+            response = client.post('/api/orders/', headers=headers, json=payload)
+            timings.append(perf_counter() - started)
+            assert response.status_code == 201 and len(response.get_json()['order']['items']) == size
+        print(f'{size:>6}{percentile(timings, 0.5) * 1000:>8.1f}ms{percentile(timings, 0.95) * 1000:>8.1f}ms'
+              f'{len(statements) / args.requests:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
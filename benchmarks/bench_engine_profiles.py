@@ -0,0 +1,108 @@
+"""Compara throughput de leitura/escrita concorrentes no SQLite com e sem o perfil de engine.
+
+Uso: python benchmarks/bench_engine_profiles.py [--seconds 5] [--readers 4] [--writers 2]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from src.services.database import engine_options, apply_engine_profile
+
+
+def run(profiled, seconds, readers, writers):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    uri = f'sqlite:///{path}'
+    if profiled:
+        engine = apply_engine_profile(create_engine(uri, **engine_options(uri)))
+    else:
+        engine = create_engine(uri, connect_args={'check_same_thread': False})
+
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE orders (id INTEGER PRIMARY KEY, company_id INTEGER, total NUMERIC)'))
+        conn.execute(text('CREATE INDEX ix_company ON orders (company_id)'))
+        conn.execute(
+            text('INSERT INTO orders (company_id, total) VALUES (:c, :t)'),
+            [{'c': i % 50, 't': i * 1.5} for i in range(20000)]
+        )
+
+    counts = {'read': 0, 'write': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def reader(n):
+        done = errors = 0
+        while time.perf_counter() < deadline:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        text('SELECT count(*), sum(total) FROM orders WHERE company_id = :c'),
+                        {'c': n % 50}
+                    ).one()
+                done += 1
+            except OperationalError:
+                errors += 1
+        with lock:
+            counts['read'] += done
+            counts['errors'] += errors
+
+    def writer(n):
+        done = errors = 0
+        while time.perf_counter() < deadline:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(
+                        text('INSERT INTO orders (company_id, total) VALUES (:c, :t)'),
+                        {'c': n % 50, 't': 10}
+                    )
+                done += 1
+            except OperationalError:
+                errors += 1
+        with lock:
+            counts['write'] += done
+            counts['errors'] += errors
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    with create_engine(uri).connect() as conn:
+        journal = conn.execute(text('PRAGMA journal_mode')).scalar()
+
+    return {
+        'journal_mode': journal,
+        'reads_per_s': counts['read'] / seconds,
+        'writes_per_s': counts['write'] / seconds,
+        'errors': counts['errors']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    args = parser.parse_args()
+
+    for label, profiled in (('padrão', False), ('perfil', True)):
+        result = run(profiled, args.seconds, args.readers, args.writers)
+        print(
+            f"{label:>7}: journal={result['journal_mode']:<8} "
+            f"leituras/s={result['reads_per_s']:>9.1f} "
+            f"escritas/s={result['writes_per_s']:>8.1f} "
+            f"erros={result['errors']}"
+        )
+
+
+if __name__ == '__main__':
+    main()
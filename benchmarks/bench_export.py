@@ -0,0 +1,60 @@
+"""Mede tempo até o primeiro byte, vazão e pico de memória da exportação CSV.
+
+Uso: python benchmarks/bench_export.py [--orders 100000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+import warnings
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import PASSWORD, generate, rep_email  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=100000)
+    parser.add_argument('--db', help='banco já gerado pelo datagen.py')
+    args = parser.parse_args()
+
+    uri = args.db or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'export.db')}"
+    if not args.db:
+        generate(uri, companies=1, reps=1, products=500, clients=2000, orders=args.orders, echo=lambda *a: None)
+
+    os.environ['SQLALCHEMY_DATABASE_URI'] = uri
+    os.environ['SQL_INSTRUMENTATION_SAMPLE_RATE'] = '0'
+    warnings.filterwarnings('ignore')
+    from src.main import app
+    app.config['JWT_VERIFY_SUB'] = False
+
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={'email': rep_email(1), 'password': PASSWORD}).get_json()['token']
+
+    tracemalloc.start()
+    started = perf_counter()
+    response = client.get('/api/orders/export', headers={'Authorization': f'Bearer {token}'}, buffered=False)
+    first_byte = None
+    total_bytes = 0
+    lines = 0
+    for chunk in response.response:
+        if first_byte is None:
+            first_byte = perf_counter() - started
+        total_bytes += len(chunk)
+        lines += chunk.count(b'\n')
+    elapsed = perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    response.close()
+
+    print(f'linhas: {lines - 1}  tamanho: {total_bytes / 1e6:.1f} MB')
+    print(f'primeiro byte: {first_byte * 1000:.1f} ms  total: {elapsed:.1f} s  ({(lines - 1) / elapsed:,.0f} linhas/s)')
+    print(f'pico de memória Python: {peak / 1e6:.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Compara serialização e tamanho em rede de um histórico de pedidos grande.
+
+Uso: python benchmarks/bench_json.py [--orders 3000] [--items 8]
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from src.services.json_provider import FastJSONProvider
+from src.services.compression import brotli
+
+
+def order_history(orders, items):
+    """Pedidos no formato de Order.to_dict(), com valores crus do banco"""
+    base = datetime(2025, 1, 1, 8, 30)
+    client = {
+        'id': 1, 'cnpj': '12.345.678/0001-90', 'razao_social': 'Cliente Exemplo Ltda',
+        'nome_fantasia': 'Exemplo', 'created_at': base, 'updated_at': base
+    }
+    payment = {'id': 4, 'name': 'PIX', 'is_active': True, 'created_at': base, 'updated_at': base}
+    history = []
+    for n in range(orders):
+        when = base + timedelta(minutes=n)
+        history.append({
+            'id': n, 'user_id': 1, 'company_id': 1, 'client_id': 1, 'payment_method_id': 4,
+            'discount_percentage': Decimal('5.00'), 'total_value': Decimal('1234.56'),
+            'status': 'Concluído', 'order_date': when, 'created_at': when, 'updated_at': when,
+            'client': client, 'payment_method': payment,
+            'items': [{
+                'id': n * items + i, 'order_id': n, 'product_id': i,
+                'quantity': {'P': 2, 'M': 5, 'G': 3, 'GG': 1},
+                'unit_value': Decimal('29.90'), 'created_at': when, 'updated_at': when,
+                'product': {
+                    'id': i, 'company_id': 1, 'code': f'PROD-{i:04d}',
+                    'description': 'Camiseta Básica Algodão', 'value': Decimal('29.90'),
+                    'sizes': ['P', 'M', 'G', 'GG'], 'created_at': base, 'updated_at': base
+                }
+            } for i in range(items)]
+        })
+    return history
+
+
+def to_legacy(obj):
+    """Conversão campo a campo feita hoje pelos to_dict()"""
+    if isinstance(obj, dict):
+        return {k: to_legacy(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [to_legacy(v) for v in obj]
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return obj
+
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=3000)
+    parser.add_argument('--items', type=int, default=8)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    history = order_history(args.orders, args.items)
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+
+    legacy_time, legacy = timed(lambda: stdlib.dumps(to_legacy(history), separators=(',', ':')).encode())
+    fast_time, payload = timed(lambda: fast.dumps_bytes(history))
+    assert json.loads(payload) == json.loads(legacy)
+
+    print(f'payload: {len(payload) / 1e6:.1f} MB ({args.orders} pedidos x {args.items} itens)')
+    print(f'stdlib + to_dict: {legacy_time * 1000:8.1f} ms')
+    print(f'FastJSONProvider: {fast_time * 1000:8.1f} ms ({legacy_time / fast_time:.1f}x)')
+
+    gzip_time, gz = timed(lambda: gzip.compress(payload, compresslevel=6))
+    print(f'gzip:   {len(gz) / 1e3:8.1f} KB ({len(gz) / len(payload):.1%}) em {gzip_time * 1000:.1f} ms')
+    if brotli is not None:
+        br_time, br = timed(lambda: brotli.compress(payload, quality=4))
+        print(f'brotli: {len(br) / 1e3:8.1f} KB ({len(br) / len(payload):.1%}) em {br_time * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
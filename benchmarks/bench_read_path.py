@@ -0,0 +1,87 @@
+"""Compara o caminho ORM e o caminho de leitura Core nas listagens.
+
+Gera (ou reutiliza) um banco com um representante e mede, para cada endpoint,
+tempo de resposta e pico de memória Python com CORE_READ_ENDPOINTS ligado e
+desligado, conferindo que os dois caminhos devolvem o mesmo JSON.
+
+Uso: python benchmarks/bench_read_path.py [--rows 50000] [--repeat 3]
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+import warnings
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import PASSWORD, generate, rep_email  # noqa: E402
+
+ENDPOINTS = [
+    ('orders.get_orders', '/api/orders/'),
+    ('catalog.get_products', '/api/catalog/products')
+]
+
+
+def measure(client, path, headers, repeat):
+    """Melhor tempo sem tracemalloc (que distorce a medida) e pico de memória numa execução à parte"""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        started = perf_counter()
+        response = client.get(path, headers=headers)
+        elapsed = perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    body = response.get_data()
+    del response
+    gc.collect()
+    tracemalloc.start()
+    client.get(path, headers=headers)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000, help='pedidos e produtos do representante')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--db', help='banco já gerado pelo datagen.py (representante 1)')
+    args = parser.parse_args()
+
+    uri = args.db or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'read_path.db')}"
+    if not args.db:
+        generate(uri, companies=1, reps=1, products=args.rows, clients=2000, orders=args.rows,
+                 max_items=3, echo=lambda *a: None)
+
+    os.environ['SQLALCHEMY_DATABASE_URI'] = uri
+    os.environ['SQL_INSTRUMENTATION_SAMPLE_RATE'] = '0'
+    warnings.filterwarnings('ignore')
+    from src.main import app
+    app.config['JWT_VERIFY_SUB'] = False
+
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={'email': rep_email(1), 'password': PASSWORD}).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    enabled = set(app.config['CORE_READ_ENDPOINTS'])
+
+    print(f"{'endpoint':<24}{'caminho':<8}{'tempo':>10}{'pico MB':>10}{'resposta MB':>13}")
+    for endpoint, path in ENDPOINTS:
+        results = {}
+        for label, endpoints in (('orm', enabled - {endpoint}), ('core', enabled | {endpoint})):
+            app.config['CORE_READ_ENDPOINTS'] = endpoints
+            elapsed, peak, body = measure(client, path, headers, args.repeat)
+            results[label] = (elapsed, peak, body)
+            print(f'{endpoint:<24}{label:<8}{elapsed * 1000:>8.0f}ms{peak / 1e6:>10.1f}{len(body) / 1e6:>13.1f}')
+        orm, core = results['orm'], results['core']
+        same = app.json.loads(orm[2]) == app.json.loads(core[2])
+        print(f'{"":<24}core: {orm[0] / core[0]:.1f}x mais rápido, {orm[1] / core[1]:.1f}x menos memória, '
+              f'JSON {"idêntico" if same else "DIFERENTE"}')
+    app.config['CORE_READ_ENDPOINTS'] = enabled
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Mede o relatório produto × tamanho: agregação no banco (json_each) vs. fallback em Python.
+
+Uso: python benchmarks/bench_size_grid.py [--orders 100000] [--db sqlite:////tmp/bench.db]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import warnings
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import generate  # noqa: E402
+
+
+def timed(func, *args):
+    started = perf_counter()
+    result = func(*args)
+    return perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=100000)
+    parser.add_argument('--db', help='banco já gerado pelo datagen.py (empresa 1)')
+    args = parser.parse_args()
+
+    uri = args.db or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'size_grid.db')}"
+    if not args.db:
+        generate(uri, companies=1, reps=20, products=500, clients=2000, orders=args.orders, echo=lambda *a: None)
+
+    os.environ['SQLALCHEMY_DATABASE_URI'] = uri
+    warnings.filterwarnings('ignore')
+    from src.main import app
+    from src.models.models import db
+    from src.services import reports
+
+    with app.app_context():
+        filters = reports._item_filters(1)
+        json_each = reports.JSON_EACH.get(db.engine.dialect.name)
+        if json_each:
+            seconds, rows = timed(lambda: list(reports._aggregate_in_database(filters, json_each)))
+            print(f'banco ({json_each}): {seconds:.2f}s  {len(rows)} células')
+        seconds, rows = timed(reports._aggregate_in_python, filters)
+        print(f'python (fallback):  {seconds:.2f}s  {len(rows)} células')
+        seconds, grid = timed(reports.size_grid, 1)
+        print(f'size_grid completo: {seconds:.2f}s  {len(grid["products"])} produtos, {grid["total_units"]} unidades')
+
+
+if __name__ == '__main__':
+    main()
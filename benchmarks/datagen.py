@@ -0,0 +1,196 @@
+"""Gerador determinístico de dados sintéticos para benchmarks.
+
+Cria empresas, representantes, produtos, clientes, pedidos e itens em massa,
+com inserts em lote via SQLAlchemy Core. A mesma seed e a mesma data âncora
+geram sempre o mesmo banco.
+
+Uso:
+    python benchmarks/datagen.py sqlite:////tmp/bench.db --scale small
+    python benchmarks/datagen.py postgresql://... --companies 50 --reps 500 \\
+        --products 20000 --orders 2000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+from sqlalchemy import create_engine, insert
+from src.models.models import (
+    db, User, Company, UserCompany, Client, PaymentMethod, Product, Order, OrderItem
+)
+from src.services.database import engine_options, apply_engine_profile
+
+SCALES = {
+    'tiny': {'companies': 2, 'reps': 6, 'products': 60, 'clients': 200, 'orders': 2000},
+    'small': {'companies': 5, 'reps': 50, 'products': 1000, 'clients': 2000, 'orders': 50000},
+    'medium': {'companies': 20, 'reps': 200, 'products': 5000, 'clients': 20000, 'orders': 500000},
+    'large': {'companies': 50, 'reps': 500, 'products': 20000, 'clients': 100000, 'orders': 2000000}
+}
+
+PASSWORD = 'bench123'
+
+SIZE_GRIDS = [
+    ['P', 'M', 'G', 'GG'],
+    ['PP', 'P', 'M', 'G', 'GG', 'XG'],
+    ['36', '38', '40', '42', '44', '46'],
+    ['34', '35', '36', '37', '38', '39', '40', '41', '42', '43'],
+    ['U']
+]
+
+PAYMENT_METHODS = ['Dinheiro', 'Cartão de Crédito', 'Cartão de Débito', 'PIX', 'Boleto', 'Transferência Bancária']
+
+STATUSES = ['Concluído'] * 8 + ['Pendente', 'Cancelado']
+
+CHUNK = 10000
+
+
+def format_cnpj(number):
+    digits = f'{number:012d}'[-12:] + f'{number % 97:02d}'
+    return f'{digits[:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:]}'
+
+
+def rep_email(n):
+    return f'rep{n:05d}@bench.local'
+
+
+def _insert(conn, table, rows):
+    for start in range(0, len(rows), CHUNK):
+        conn.execute(insert(table), rows[start:start + CHUNK])
+
+
+def generate(uri, companies, reps, products, clients, orders, seed=42, anchor=None, max_items=8, echo=print):
+    """Popula o banco indicado; retorna o resumo do que foi gerado"""
+    rng = random.Random(seed)
+    anchor = anchor or datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    engine = apply_engine_profile(create_engine(uri, **engine_options(uri)))
+    db.metadata.create_all(engine)
+    started = time.perf_counter()
+
+    # bcrypt é caro: um único hash com o custo padrão serve para todos os representantes
+    password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    item_count = 0
+
+    with engine.begin() as conn:
+        conn.execute(insert(PaymentMethod.__table__), [
+            {'id': i + 1, 'name': name, 'is_active': True, 'created_at': anchor, 'updated_at': anchor}
+            for i, name in enumerate(PAYMENT_METHODS)
+        ])
+        conn.execute(insert(Company.__table__), [
+            {'id': c, 'name': f'Distribuidora {c:03d} Ltda', 'cnpj': format_cnpj(10 ** 9 + c),
+             'created_at': anchor, 'updated_at': anchor}
+            for c in range(1, companies + 1)
+        ])
+        conn.execute(insert(User.__table__), [
+            {'id': r, 'email': rep_email(r), 'password_hash': password_hash,
+             'created_at': anchor, 'updated_at': anchor}
+            for r in range(1, reps + 1)
+        ])
+        # Cada representante atende uma empresa
+        rep_company = {r: (r - 1) % companies + 1 for r in range(1, reps + 1)}
+        conn.execute(insert(UserCompany.__table__), [
+            {'user_id': r, 'company_id': c} for r, c in rep_company.items()
+        ])
+
+        product_rows = []
+        products_by_company = {c: [] for c in range(1, companies + 1)}
+        for p in range(1, products + 1):
+            company_id = (p - 1) % companies + 1
+            sizes = rng.choice(SIZE_GRIDS)
+            value = round(rng.uniform(9.9, 499.9), 2)
+            product_rows.append({
+                'id': p, 'company_id': company_id, 'code': f'PRD-{p:06d}',
+                'description': f'Produto sintético {p}', 'value': value, 'sizes': sizes,
+                'created_at': anchor, 'updated_at': anchor
+            })
+            products_by_company[company_id].append((p, sizes, value))
+        _insert(conn, Product.__table__, product_rows)
+        del product_rows
+
+        client_rows = []
+        for c in range(1, clients + 1):
+            cnpj = format_cnpj(2 * 10 ** 9 + c)
+            razao_social = f'Cliente {c:06d} Comércio Ltda'
+            nome_fantasia = f'Loja {c:06d}'
+            client_rows.append({
+                'id': c, 'cnpj': cnpj, 'razao_social': razao_social, 'nome_fantasia': nome_fantasia,
+                'created_at': anchor, 'updated_at': anchor,
+                **Client.search_columns(cnpj, razao_social, nome_fantasia)
+            })
+        _insert(conn, Client.__table__, client_rows)
+        del client_rows
+        echo(f'cadastros: {time.perf_counter() - started:.1f}s')
+
+    item_id = 0
+    for start in range(1, orders + 1, CHUNK):
+        order_rows, item_rows = [], []
+        for o in range(start, min(start + CHUNK, orders + 1)):
+            rep = rng.randint(1, reps)
+            company_id = rep_company[rep]
+            when = anchor - timedelta(seconds=rng.randint(0, 365 * 86400))
+            total = 0.0
+            catalog = products_by_company[company_id]
+            for product_id, sizes, value in rng.sample(catalog, min(len(catalog), rng.randint(1, max_items))):
+                quantity = {size: rng.randint(1, 12) for size in sizes if rng.random() < 0.6} or {sizes[0]: 1}
+                total += value * sum(quantity.values())
+                item_id += 1
+                item_rows.append({
+                    'id': item_id, 'order_id': o, 'product_id': product_id, 'quantity': quantity,
+                    'unit_value': value, 'created_at': when, 'updated_at': when
+                })
+            discount = rng.choice([0, 0, 0, 5, 10])
+            order_rows.append({
+                'id': o, 'user_id': rep, 'company_id': company_id, 'client_id': rng.randint(1, clients),
+                'payment_method_id': rng.randint(1, len(PAYMENT_METHODS)), 'discount_percentage': discount,
+                'total_value': round(total * (1 - discount / 100), 2), 'status': rng.choice(STATUSES),
+                'order_date': when, 'created_at': when, 'updated_at': when
+            })
+        with engine.begin() as conn:
+            _insert(conn, Order.__table__, order_rows)
+            _insert(conn, OrderItem.__table__, item_rows)
+        item_count = item_id
+        done = min(start + CHUNK - 1, orders)
+        echo(f'pedidos: {done}/{orders} ({time.perf_counter() - started:.1f}s)')
+
+    if engine.dialect.name == 'postgresql':
+        # Ids explícitos não avançam as sequences
+        with engine.begin() as conn:
+            for table in ('payment_methods', 'companies', 'users', 'products', 'clients', 'orders', 'order_items'):
+                conn.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"
+                )
+    engine.dispose()
+
+    return {
+        'companies': companies, 'reps': reps, 'products': products, 'clients': clients,
+        'orders': orders, 'order_items': item_count, 'seconds': round(time.perf_counter() - started, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('uri')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    for field in ('companies', 'reps', 'products', 'clients', 'orders'):
+        parser.add_argument(f'--{field}', type=int)
+    parser.add_argument('--max-items', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--anchor', help='data âncora (AAAA-MM-DD); padrão: hoje')
+    args = parser.parse_args()
+
+    sizes = dict(SCALES[args.scale])
+    for field in sizes:
+        if getattr(args, field) is not None:
+            sizes[field] = getattr(args, field)
+    anchor = datetime.strptime(args.anchor, '%Y-%m-%d') if args.anchor else None
+
+    summary = generate(args.uri, seed=args.seed, anchor=anchor, max_items=args.max_items, **sizes)
+    print(summary)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""Teste de carga ponta a ponta da API com relatório de percentis por endpoint.
+
+Por padrão sobe a aplicação em processo sobre um banco gerado por datagen.py;
+com --url dispara contra um servidor já em execução (o banco dele deve ter sido
+gerado pelo datagen.py).
+
+Uso:
+    python benchmarks/loadtest.py --scale tiny --duration 20 --workers 8
+    python benchmarks/loadtest.py --url http://localhost:5000 --save-baseline /tmp/base.json
+
+Comparação com uma rodada anterior (a baseline depende da máquina e não fica no
+repositório; grave uma antes da mudança e compare depois):
+    python benchmarks/loadtest.py --db sqlite:////tmp/bench.db --save-baseline /tmp/base.json
+    python benchmarks/loadtest.py --db sqlite:////tmp/bench.db --baseline /tmp/base.json
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import SCALES, PASSWORD, generate, rep_email, format_cnpj  # noqa: E402
+
+# Perfil: (nome, peso)
+PROFILE = [
+    ('login', 5),
+    ('catalog', 20),
+    ('order_create', 30),
+    ('sync', 10),
+    ('dashboard', 35)
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class InProcessClient:
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, path, json_body=None, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        response = self._client.open(path, method=method, json=json_body, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HTTPClient:
+    def __init__(self, base_url):
+        import requests
+        self._session = requests.Session()
+        self._base_url = base_url.rstrip('/')
+
+    def request(self, method, path, json_body=None, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        response = self._session.request(method, self._base_url + path, json=json_body, headers=headers)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body
+
+
+class Worker(threading.Thread):
+    def __init__(self, n, client, scale, deadline, seed, results, lock):
+        super().__init__(daemon=True)
+        self.rng = random.Random(seed * 1000 + n)
+        self.client = client
+        self.scale = scale
+        self.deadline = deadline
+        self.results = results
+        self.lock = lock
+        self.rep = self.rng.randint(1, scale['reps'])
+        self.token = None
+        self.codes = []
+
+    def _order_payload(self, items):
+        chosen = self.rng.sample(self.codes, min(len(self.codes), items))
+        return {
+            'client_cnpj': format_cnpj(2 * 10 ** 9 + self.rng.randint(1, self.scale['clients'])),
+            'client_razao_social': 'Cliente carga',
+            'payment_method_id': self.rng.randint(1, 6),
+            'items': [{'code': code, 'quantity': {'P': self.rng.randint(1, 5)}} for code in chosen]
+        }
+
+    def action(self, name):
+        if name == 'login':
+            return self.client.request('POST', '/api/auth/login', {
+                'email': rep_email(self.rep), 'password': PASSWORD
+            })
+        if name == 'catalog':
+            return self.client.request('GET', '/api/catalog/products', token=self.token)
+        if name == 'order_create':
+            return self.client.request('POST', '/api/orders/', self._order_payload(self.rng.randint(1, 10)), self.token)
+        if name == 'sync':
+            batch = [self._order_payload(self.rng.randint(1, 5)) for _ in range(20)]
+            return self.client.request('POST', '/api/orders/sync', {'orders': batch}, self.token)
+        return self.client.request('GET', '/api/dashboard/metrics', token=self.token)
+
+    def run(self):
+        status, body = self.action('login')
+        if status != 200:
+            with self.lock:
+                self.results.setdefault('_setup_errors', []).append(status)
+            return
+        self.token = body['token']
+        status, body = self.action('catalog')
+        self.codes = [p['code'] for p in body or []] or ['PRD-000001']
+
+        names = [name for name, _ in PROFILE]
+        weights = [weight for _, weight in PROFILE]
+        local = {name: {'latencies': [], 'errors': 0} for name in names}
+        while time.perf_counter() < self.deadline:
+            name = self.rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            status, _ = self.action(name)
+            elapsed = time.perf_counter() - started
+            local[name]['latencies'].append(elapsed)
+            if status >= 400:
+                local[name]['errors'] += 1
+
+        with self.lock:
+            for name, data in local.items():
+                entry = self.results.setdefault(name, {'latencies': [], 'errors': 0})
+                entry['latencies'].extend(data['latencies'])
+                entry['errors'] += data['errors']
+
+
+def build_app(uri):
+    os.environ['SQLALCHEMY_DATABASE_URI'] = uri
+    warnings.filterwarnings('ignore')
+    from src.main import app
+    logging.getLogger('src.sql').setLevel(logging.ERROR)
+    # Os tokens são emitidos com identity inteira
+    app.config['JWT_VERIFY_SUB'] = False
+    return app
+
+
+def summarize(results, duration):
+    report = {}
+    for name, _ in PROFILE:
+        data = results.get(name, {'latencies': [], 'errors': 0})
+        latencies = data['latencies']
+        report[name] = {
+            'requests': len(latencies),
+            'errors': data['errors'],
+            'rps': round(len(latencies) / duration, 2),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2)
+        }
+    total = sum(entry['requests'] for entry in report.values())
+    report['_total'] = {'requests': total, 'rps': round(total / duration, 2)}
+    return report
+
+
+def print_report(report, baseline=None):
+    print(f"{'endpoint':<14}{'req':>8}{'err':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, _ in PROFILE:
+        entry = report[name]
+        line = (
+            f"{name:<14}{entry['requests']:>8}{entry['errors']:>6}{entry['rps']:>9.1f}"
+            f"{entry['p50_ms']:>10.1f}{entry['p95_ms']:>10.1f}{entry['p99_ms']:>10.1f}"
+        )
+        if baseline and name in baseline and baseline[name]['p95_ms']:
+            change = entry['p95_ms'] / baseline[name]['p95_ms'] - 1
+            line += f'   p95 {change:+.0%} vs baseline'
+        print(line)
+    print(f"{'total':<14}{report['_total']['requests']:>8}{'':>6}{report['_total']['rps']:>9.1f}")
+
+
+def regressions(report, baseline, tolerance):
+    found = []
+    for name, _ in PROFILE:
+        if name not in baseline:
+            continue
+        old, new = baseline[name], report[name]
+        if old['p95_ms'] and new['p95_ms'] > old['p95_ms'] * (1 + tolerance):
+            found.append(f"{name}: p95 {old['p95_ms']}ms -> {new['p95_ms']}ms")
+        if old['rps'] and new['rps'] < old['rps'] * (1 - tolerance):
+            found.append(f"{name}: rps {old['rps']} -> {new['rps']}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='servidor já em execução')
+    parser.add_argument('--db', help='URI do banco (padrão: SQLite temporário gerado na hora)')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='tiny')
+    parser.add_argument('--generate', action='store_true', help='gera os dados mesmo com --db')
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save-baseline')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    scale = SCALES[args.scale]
+    if args.url:
+        make_client = lambda: HTTPClient(args.url)  # noqa: E731
+    else:
+        uri = args.db or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+        if args.generate or not args.db:
+            generate(uri, seed=args.seed, **scale)
+        app = build_app(uri)
+        make_client = lambda: InProcessClient(app)  # noqa: E731
+
+    results, lock = {}, threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    workers = [
+        Worker(n, make_client(), scale, deadline, args.seed, results, lock)
+        for n in range(args.workers)
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    duration = time.perf_counter() - started
+
+    if results.get('_setup_errors'):
+        print(f"falha no login de {len(results['_setup_errors'])} workers: {results['_setup_errors']}")
+        sys.exit(2)
+
+    report = summarize(results, duration)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'baseline salvo em {args.save_baseline}')
+
+    if baseline:
+        found = regressions(report, baseline, args.tolerance)
+        if found:
+            print('regressões acima da tolerância:')
+            for line in found:
+                print(f'  {line}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
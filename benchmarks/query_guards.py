@@ -0,0 +1,178 @@
+"""Guardas de regressão de N+1 e de latência por endpoint.
+
+Semeia duas empresas com volumes diferentes (pequena e grande), chama cada
+endpoint como um representante de cada uma e exige que:
+  - o número de statements SQL seja o mesmo nos dois volumes;
+  - o tempo de resposta no volume grande fique dentro do orçamento.
+
+Em caso de falha lista as queries que cresceram. Sai com código 1 se alguma
+guarda falhar, para poder rodar no CI.
+
+Uso: python benchmarks/query_guards.py [--small 3] [--large 40] [--verbose]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import warnings
+from datetime import datetime, timedelta
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'guards.db')}")
+os.environ['SQL_INSTRUMENTATION_SAMPLE_RATE'] = '0'
+os.environ.pop('SQLALCHEMY_REPLICA_URI', None)
+warnings.filterwarnings('ignore')
+
+from src.main import app  # noqa: E402
+from src.models.models import (  # noqa: E402
+    db, User, Company, UserCompany, Client, Product, Order, OrderItem
+)
+from src.services.instrumentation import capture_queries  # noqa: E402
+
+PASSWORD = 'guard123'
+
+# (nome, método, caminho, corpo, orçamento em ms). {order_id} é o pedido mais recente do tenant.
+ENDPOINTS = [
+    ('auth.me', 'GET', '/api/auth/me', None, 100),
+    ('orders.list', 'GET', '/api/orders/', None, 400),
+    ('orders.detail', 'GET', '/api/orders/{order_id}', None, 100),
+    ('orders.batch', 'GET', '/api/orders/batch?ids={order_id}', None, 100),
+    ('orders.search', 'GET', '/api/orders/search?status=Concluído&limit=20', None, 200),
+    ('orders.changes', 'GET', '/api/orders/changes?limit=100', None, 100),
+    ('dashboard.metrics', 'GET', '/api/dashboard/metrics', None, 200),
+    ('dashboard.pending', 'GET', '/api/dashboard/pending-orders-count', None, 100),
+    ('catalog.products', 'GET', '/api/catalog/products', None, 200),
+    ('catalog.payment_methods', 'GET', '/api/catalog/payment-methods', None, 100),
+    ('user.users', 'GET', '/api/user/users', None, 100),
+    ('clients.search', 'GET', '/api/clients/?q=Cliente', None, 100),
+    ('reports.size_grid', 'GET', '/api/reports/size-grid', None, 300),
+    ('jobs.list', 'GET', '/api/jobs/', None, 100),
+    ('bootstrap', 'GET', '/api/bootstrap', None, 300)
+]
+
+
+def seed_tenant(label, orders, products=8, clients=5):
+    """Cria empresa, representante, catálogo e pedidos; retorna o e-mail do representante"""
+    company = Company(name=f'Guarda {label}', cnpj=f'00.000.000/0000-{len(label):02d}{label[:2]}')
+    user = User(email=f'guard-{label}@local')
+    user.set_password(PASSWORD)
+    db.session.add_all([company, user])
+    db.session.flush()
+    db.session.add(UserCompany(user_id=user.id, company_id=company.id))
+
+    catalog = [
+        Product(company_id=company.id, code=f'{label}-{p}', description=f'Produto {p}',
+                value=10 + p, sizes=['P', 'M', 'G'])
+        for p in range(products)
+    ]
+    customers = [
+        Client(cnpj=f'{label[:2]}.{c:03d}.000/0001-00', razao_social=f'Cliente {label} {c}')
+        for c in range(clients)
+    ]
+    db.session.add_all(catalog + customers)
+    db.session.flush()
+
+    now = datetime.utcnow()
+    for n in range(orders):
+        order = Order(
+            user_id=user.id, company_id=company.id, client_id=customers[n % clients].id,
+            payment_method_id=1 + n % 6, total_value=100, status='Concluído' if n % 3 else 'Pendente',
+            order_date=now - timedelta(days=n % 60)
+        )
+        for p in range(3):
+            order.order_items.append(OrderItem(
+                product_id=catalog[(n + p) % products].id, quantity={'P': 1, 'M': 2}, unit_value=10
+            ))
+        db.session.add(order)
+    db.session.commit()
+    return user.email
+
+
+def login(client, email):
+    response = client.post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+    token = response.get_json()['token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+def latest_order_id(headers, client):
+    orders = client.get('/api/orders/', headers=headers).get_json()
+    return orders[0]['id'] if orders else 0
+
+
+def measure(client, method, path, body, headers):
+    with capture_queries() as stats:
+        started = perf_counter()
+        response = client.open(path, method=method, json=body, headers=headers)
+        elapsed_ms = (perf_counter() - started) * 1000
+    return response.status_code, stats, elapsed_ms
+
+
+def grown_statements(small, large):
+    grown = []
+    for statement, (count, _) in large.statements.items():
+        before = small.statements.get(statement, [0])[0]
+        if count > before:
+            grown.append((before, count, statement))
+    return sorted(grown, reverse=True, key=lambda item: item[1] - item[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--small', type=int, default=3)
+    parser.add_argument('--large', type=int, default=40)
+    parser.add_argument('--budget-scale', type=float, default=1.0, help='multiplica os orçamentos de tempo')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    logging.getLogger('src.sql').setLevel(logging.ERROR)
+    app.config['JWT_VERIFY_SUB'] = False
+    with app.app_context():
+        small_email = seed_tenant('small', args.small)
+        large_email = seed_tenant('large', args.large)
+
+    client = app.test_client()
+    small_headers = login(client, small_email)
+    large_headers = login(client, large_email)
+    small_order = latest_order_id(small_headers, client)
+    large_order = latest_order_id(large_headers, client)
+
+    failures = 0
+    for name, method, path, body, budget_ms in ENDPOINTS:
+        # Aquecimento para não medir compilação de statements/caches frios
+        client.open(path.format(order_id=large_order), method=method, json=body, headers=large_headers)
+
+        small_status, small_stats, _ = measure(
+            client, method, path.format(order_id=small_order), body, small_headers)
+        large_status, large_stats, elapsed_ms = measure(
+            client, method, path.format(order_id=large_order), body, large_headers)
+
+        problems = []
+        if small_status >= 400 or large_status >= 400:
+            problems.append(f'status {small_status}/{large_status}')
+        if large_stats.query_count != small_stats.query_count:
+            problems.append(f'queries {small_stats.query_count} -> {large_stats.query_count}')
+        if elapsed_ms > budget_ms * args.budget_scale:
+            problems.append(f'{elapsed_ms:.1f}ms > orçamento {budget_ms * args.budget_scale:.0f}ms')
+
+        status = 'FALHA' if problems else 'OK  '
+        print(f'{status} {name:<26} queries={large_stats.query_count:<3} {elapsed_ms:7.1f}ms  {"; ".join(problems)}')
+        if problems:
+            failures += 1
+            for before, after, statement in grown_statements(small_stats, large_stats)[:5]:
+                print(f'      {before} -> {after}x  {" ".join(statement.split())[:300]}')
+            if large_stats.query_count == small_stats.query_count:
+                for entry in large_stats.worst(3):
+                    print(f"      {entry['total_ms']}ms {entry['count']}x  {' '.join(entry['statement'].split())[:300]}")
+        elif args.verbose:
+            for entry in large_stats.worst(3):
+                print(f"      {entry['total_ms']}ms {entry['count']}x  {' '.join(entry['statement'].split())[:200]}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
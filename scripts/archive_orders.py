@@ -0,0 +1,48 @@
+"""Move pedidos antigos (e seus itens) para as tabelas de arquivo.
+
+O detalhe do pedido continua encontrando os pedidos arquivados; listagem,
+busca, dashboard e exportação passam a ler só a tabela quente.
+
+Uso:
+    python scripts/archive_orders.py [--days 365] [--batch-size 1000] [--company 3]
+    python scripts/archive_orders.py --async   # enfileira como job orders.archive para o servidor
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.main import app  # noqa: E402
+from src.services.archive import DEFAULT_BATCH_SIZE, archive_horizon, archive_orders  # noqa: E402
+from src.services.jobs import runner  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, help='horizonte em dias (padrão: ARCHIVE_HORIZON_DAYS)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--company', type=int, help='arquiva só os pedidos desta empresa')
+    parser.add_argument('--async', dest='run_async', action='store_true', help='enfileira como job em vez de rodar aqui')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.run_async:
+            job_id = runner.enqueue('orders.archive', {
+                'horizon_days': args.days, 'batch_size': args.batch_size, 'company_id': args.company
+            }, company_id=args.company)
+            print(f'job {job_id} enfileirado; o servidor o executa na próxima varredura de jobs')
+            return
+
+        before = archive_horizon(args.days)
+        print(f'arquivando pedidos anteriores a {before:%Y-%m-%d}...')
+        summary = archive_orders(
+            before, batch_size=args.batch_size, company_id=args.company,
+            report_progress=lambda fraction: print(f'  {fraction:.0%}', end='\r', flush=True)
+        )
+        print()
+        print(f"{summary['orders']} pedidos e {summary['items']} itens arquivados")
+
+
+if __name__ == '__main__':
+    main()
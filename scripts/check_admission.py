@@ -0,0 +1,86 @@
+"""Verifica o controle de admissão: requisições na fila não seguram conexões do pool.
+
+Registra uma rota de teste na classe 'dashboard' com concorrência 1; uma
+requisição admitida fica presa segurando sua conexão enquanto outras esperam na
+fila, e o pool deve ter só a conexão da admitida em uso.
+
+Uso: python scripts/check_admission.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+workdir = tempfile.mkdtemp()
+os.environ['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(workdir, 'admission.db')}"
+os.environ['ADMISSION_LIMITS_DASHBOARD'] = 'concurrency=1,queue=4,timeout=10'
+
+from flask import jsonify  # noqa: E402
+from src.main import app  # noqa: E402
+from src.models.models import db, Product  # noqa: E402
+from src.routes.auth import jwt_login_required  # noqa: E402
+from src.services.admission import admission_controlled, controller  # noqa: E402
+
+QUEUED = 4
+release = threading.Event()
+
+
+@app.route('/_check/admission')
+@jwt_login_required
+@admission_controlled('dashboard')
+def _held_request():
+    count = Product.query.count()
+    release.wait(10)
+    return jsonify({'products': count})
+
+
+def main():
+    app.config['JWT_VERIFY_SUB'] = False
+    token = app.test_client().post('/api/auth/login', json={
+        'email': 'admin@exemplo.com', 'password': '123456'
+    }).json['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    statuses = []
+
+    def call():
+        statuses.append(app.test_client().get('/_check/admission', headers=headers).status_code)
+
+    threads = [threading.Thread(target=call) for _ in range(1 + QUEUED)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+
+    def waiting():
+        return sum(gate.waiting for (_, route_class), gate in controller._gates.items() if route_class == 'dashboard')
+
+    for _ in range(100):
+        if waiting() == QUEUED:
+            break
+        time.sleep(0.05)
+    with app.app_context():
+        checked_out = db.engine.pool.checkedout()
+
+    checks = [
+        (f'{QUEUED} requisições na fila', waiting() == QUEUED),
+        (f'só a admitida segura conexão (em uso: {checked_out})', checked_out <= 1)
+    ]
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    checks.append(('todas atendidas depois da fila', statuses.count(200) == 1 + QUEUED))
+
+    failed = False
+    for name, ok in checks:
+        print(f"{'OK  ' if ok else 'FALHA'} {name}")
+        failed = failed or not ok
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
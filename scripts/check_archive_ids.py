@@ -0,0 +1,76 @@
+"""Verifica que ids de pedidos arquivados não são reaproveitados (arquivar -> criar -> arquivar).
+
+Usa um arquivo SQLite local: arquiva todos os pedidos, cria um novo e confere
+que ele recebe um id inédito, que o pedido arquivado continua acessível pelo
+id antigo e que um segundo arquivamento não colide com o primeiro.
+
+Uso: python scripts/check_archive_ids.py
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+workdir = tempfile.mkdtemp()
+os.environ['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(workdir, 'archive.db')}"
+
+from sqlalchemy import update  # noqa: E402
+from src.main import app  # noqa: E402
+from src.models.models import db, Order  # noqa: E402
+from src.services.archive import archive_orders  # noqa: E402
+
+ORDER = {
+    'client_cnpj': '11.222.333/0001-81',
+    'client_razao_social': 'Cliente Arquivo Ltda',
+    'payment_method_id': 4,
+    'items': [{'code': 'CAMISETA-001', 'quantity': {'P': 2, 'M': 1}}]
+}
+
+
+def archive_all():
+    """Envelhece todos os pedidos quentes e os arquiva"""
+    with app.app_context():
+        orders = Order.__table__
+        with db.engine.begin() as conn:
+            conn.execute(update(orders).values(order_date=datetime.utcnow() - timedelta(days=1000)))
+        return archive_orders(datetime.utcnow() - timedelta(days=1))
+
+
+def main():
+    app.config['JWT_VERIFY_SUB'] = False
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={'email': 'admin@exemplo.com', 'password': '123456'}).json['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    checks = []
+
+    first = [client.post('/api/orders/', headers=headers, json=ORDER).json['order']['id'] for _ in range(2)]
+    checks.append(('primeiro arquivamento', archive_all()['orders'] == 2))
+
+    created = client.post('/api/orders/', headers=headers, json=ORDER).json['order']
+    checks.append(('pedido novo recebe id inédito', created['id'] > max(first)))
+    archived = client.get(f'/api/orders/{max(first)}', headers=headers)
+    checks.append(('id antigo continua no arquivo', archived.status_code == 200 and archived.json.get('archived') is True))
+    fresh = client.get(f"/api/orders/{created['id']}", headers=headers)
+    checks.append(('id novo lê o pedido quente', fresh.status_code == 200 and not fresh.json.get('archived')))
+    ids = [*first, created['id']]
+    batch = client.get(f"/api/orders/batch?ids={','.join(map(str, ids))}", headers=headers)
+    checks.append(('lote devolve os arquivados e o novo', batch.status_code == 200
+                   and [order['id'] for order in batch.json['orders']] == ids))
+
+    try:
+        checks.append(('segundo arquivamento', archive_all()['orders'] == 1))
+    except Exception as e:
+        checks.append((f'segundo arquivamento ({e.__class__.__name__})', False))
+
+    failed = False
+    for name, ok in checks:
+        print(f"{'OK  ' if ok else 'FALHA'} {name}")
+        failed = failed or not ok
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Verifica via EXPLAIN que toda combinação de filtros da busca de pedidos usa índice.
+
+Roda contra o banco configurado em SQLALCHEMY_DATABASE_URI (SQLite ou Postgres);
+sem ele, usa um SQLite temporário. Sai com código 1 se algum plano fizer
+varredura completa de `orders`.
+
+Uso: python scripts/check_order_search_plans.py
+"""
+import itertools
+import os
+import sys
+import tempfile
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'plans.db')}")
+warnings.filterwarnings('ignore')
+
+from src.main import app  # noqa: E402
+from src.models.models import db  # noqa: E402
+from src.routes.orders import build_order_search  # noqa: E402
+
+FILTERS = {
+    'date_from': '2025-01-01',
+    'date_to': '2025-12-31',
+    'status': 'Concluído',
+    'client_id': '1',
+    'client_cnpj': '12.3',
+    'client_name': 'Loja'
+}
+
+
+def explain(connection, stmt):
+    compiled = stmt.compile(dialect=connection.dialect)
+    if connection.dialect.name == 'sqlite':
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).all()
+        plan = [row[-1] for row in rows]
+        full_scan = any(line.startswith('SCAN orders') for line in plan)
+    else:
+        rows = connection.exec_driver_sql(f'EXPLAIN {compiled}', compiled.params).all()
+        plan = [row[0] for row in rows]
+        full_scan = any('Seq Scan on orders' in line for line in plan)
+    return plan, full_scan
+
+
+def main():
+    failures = 0
+    with app.app_context():
+        with db.engine.connect() as connection:
+            if connection.dialect.name == 'postgresql':
+                # Em tabelas pequenas o Postgres prefere seq scan; forçamos a avaliação dos índices
+                connection.exec_driver_sql('SET enable_seqscan = off')
+            for size in range(len(FILTERS) + 1):
+                for combo in itertools.combinations(FILTERS, size):
+                    args = {key: FILTERS[key] for key in combo}
+                    plan, full_scan = explain(connection, build_order_search(1, 1, args))
+                    label = ', '.join(combo) or '(sem filtros)'
+                    print(f"{'FALHA' if full_scan else 'OK  '} {label}")
+                    if full_scan:
+                        failures += 1
+                        for line in plan:
+                            print(f'      {line}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
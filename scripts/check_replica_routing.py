@@ -0,0 +1,83 @@
+"""Verifica o roteamento primário/réplica usando dois arquivos SQLite locais.
+
+O primário é semeado pela aplicação e copiado para a réplica; depois cada lado
+recebe uma marca diferente para que seja possível saber de onde veio a leitura.
+
+Uso: python scripts/check_replica_routing.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+workdir = tempfile.mkdtemp()
+primary_path = os.path.join(workdir, 'primary.db')
+replica_path = os.path.join(workdir, 'replica.db')
+os.environ['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{primary_path}'
+os.environ['SQLALCHEMY_REPLICA_URI'] = f'sqlite:///{replica_path}'
+os.environ['REPLICA_STICKY_SECONDS'] = '1'
+
+from src.main import app  # noqa: E402
+from src.models.models import db, Product  # noqa: E402
+
+
+def label_products(label):
+    with app.app_context():
+        Product.query.filter_by(code='CAMISETA-001').update({'description': label})
+        db.session.commit()
+
+
+def main():
+    app.config['JWT_VERIFY_SUB'] = False
+
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    shutil.copyfile(primary_path, replica_path)
+
+    label_products('primario')
+    with app.app_context():
+        replica = db.engines['replica']
+        with replica.begin() as conn:
+            conn.execute(
+                Product.__table__.update()
+                .where(Product.code == 'CAMISETA-001')
+                .values(description='replica')
+            )
+
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={
+        'email': 'admin@exemplo.com', 'password': '123456'
+    }).json['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def source():
+        products = client.get('/api/catalog/products', headers=headers).json
+        return next(p['description'] for p in products if p['code'] == 'CAMISETA-001')
+
+    checks = []
+    checks.append(('GET lê da réplica', source() == 'replica'))
+
+    response = client.post('/api/catalog/products', headers=headers, json={
+        'code': 'NOVO-001', 'description': 'Novo', 'value': 10
+    })
+    checks.append(('POST grava no primário', response.status_code == 201))
+    checks.append(('GET logo após escrita lê do primário', source() == 'primario'))
+
+    time.sleep(1.2)
+    checks.append(('GET após a janela volta para a réplica', source() == 'replica'))
+
+    failed = False
+    for name, ok in checks:
+        print(f"{'OK  ' if ok else 'FALHA'} {name}")
+        failed = failed or not ok
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
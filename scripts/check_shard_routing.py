@@ -0,0 +1,171 @@
+"""Verifica o roteamento por empresa entre shards usando três arquivos SQLite locais.
+
+A empresa semeada fica no banco principal; uma segunda empresa é mapeada para
+shard_a, recebe produto e pedidos pela API, tem um pedido arquivado e depois é
+movida para shard_b e de volta a shard_a com move_company. A mudança para o
+principal, onde os ids já existem, deve ser abortada sem alterar nada.
+
+Uso: python scripts/check_shard_routing.py
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+workdir = tempfile.mkdtemp()
+os.environ['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(workdir, 'primary.db')}"
+os.environ['SHARD_BINDS'] = (
+    f"shard_a=sqlite:///{os.path.join(workdir, 'shard_a.db')},"
+    f"shard_b=sqlite:///{os.path.join(workdir, 'shard_b.db')}"
+)
+os.environ['SHARD_MAP_TTL_SECONDS'] = '0'
+os.environ['CHANGES_SETTLE_SECONDS'] = '0'
+
+from sqlalchemy import func, select, update  # noqa: E402
+from src.main import app  # noqa: E402
+from src.models.models import (  # noqa: E402
+    db, ArchivedOrder, Company, CompanyShard, Order, OrderEvent, Product, User, UserCompany
+)
+from src.services.archive import archive_orders  # noqa: E402
+from src.services.sharding import move_company, shard_engine  # noqa: E402
+
+ORDER = {
+    'client_cnpj': '11.222.333/0001-81',
+    'client_razao_social': 'Cliente Shard Ltda',
+    'payment_method_id': 4,
+    'items': [{'code': 'SHARD-001', 'quantity': {'P': 2, 'M': 1}}]
+}
+
+
+def count(bind_key, table, company_id):
+    with app.app_context():
+        engine = db.engines[bind_key] if bind_key else db.engine
+        with engine.connect() as conn:
+            return conn.execute(
+                select(func.count()).select_from(table).where(table.c.company_id == company_id)
+            ).scalar()
+
+
+def archive_order(company_id, order_id):
+    """Envelhece o pedido no shard atual da empresa e roda o arquivamento"""
+    with app.app_context():
+        orders = Order.__table__
+        with shard_engine(company_id).begin() as conn:
+            conn.execute(update(orders).where(orders.c.id == order_id)
+                         .values(order_date=datetime.utcnow() - timedelta(days=1000)))
+        return archive_orders(datetime.utcnow() - timedelta(days=1), company_id=company_id)['orders']
+
+
+def main():
+    app.config['JWT_VERIFY_SUB'] = False
+
+    with app.app_context():
+        company = Company(name='Distribuidora Shard', cnpj='98.765.432/0001-10')
+        user = User(email='shard@exemplo.com')
+        user.set_password('123456')
+        db.session.add_all([company, user])
+        db.session.flush()
+        db.session.add(UserCompany(user_id=user.id, company_id=company.id))
+        db.session.add(CompanyShard(company_id=company.id, bind_key='shard_a'))
+        db.session.commit()
+        company_id = company.id
+
+    client = app.test_client()
+
+    def headers_for(email):
+        token = client.post('/api/auth/login', json={'email': email, 'password': '123456'}).json['token']
+        return {'Authorization': f'Bearer {token}'}
+
+    admin, shard = headers_for('admin@exemplo.com'), headers_for('shard@exemplo.com')
+    orders, products, events = Order.__table__, Product.__table__, OrderEvent.__table__
+    archived = ArchivedOrder.__table__
+    checks = []
+
+    response = client.post('/api/catalog/products', headers=shard, json={
+        'code': 'SHARD-001', 'description': 'Produto no shard', 'value': 10, 'sizes': ['P', 'M']
+    })
+    checks.append(('produto da empresa vai para o shard', response.status_code == 201
+                   and count('shard_a', products, company_id) == 1 and count(None, products, company_id) == 0))
+
+    response = client.post('/api/orders/', headers=shard, json=ORDER)
+    checks.append(('pedido criado no shard', response.status_code == 201
+                   and count('shard_a', orders, company_id) == 1 and count(None, orders, company_id) == 0))
+
+    response = client.post('/api/orders/sync?async=1', headers=shard, json={'orders': [ORDER]})
+    job_url = response.headers.get('Location')
+    for _ in range(100):
+        job = client.get(job_url, headers=shard).json
+        if job.get('status') in ('succeeded', 'failed'):
+            break
+        time.sleep(0.05)
+    checks.append(('job de sync grava no shard da empresa', job.get('status') == 'succeeded'
+                   and count('shard_a', orders, company_id) == 2))
+
+    response = client.post('/api/orders/', headers=admin, json={
+        **ORDER, 'items': [{'code': 'CAMISETA-001', 'quantity': {'P': 1}}]
+    })
+    checks.append(('empresa sem shard continua no principal', response.status_code == 201
+                   and count(None, orders, 1) == 1 and count('shard_a', orders, 1) == 0))
+
+    listed = client.get('/api/orders/', headers=shard).json
+    checks.append(('listagem lê do shard', len(listed) == 2 and listed[0]['items'][0]['product']['code'] == 'SHARD-001'))
+    detail = client.get(f"/api/orders/{listed[0]['id']}", headers=shard)
+    checks.append(('detalhe lê do shard', detail.status_code == 200
+                   and detail.json['payment_method']['id'] == 4))
+    grid = client.get('/api/reports/size-grid', headers=shard).json
+    checks.append(('relatório lê do shard', grid.get('total_units') == 6))
+    checks.append(('empresa principal não vê pedidos do shard', len(client.get('/api/orders/', headers=admin).json) == 1))
+
+    hot_id, archived_id = listed[0]['id'], listed[1]['id']
+    checks.append(('arquivamento no shard', archive_order(company_id, archived_id) == 1))
+
+    with app.app_context():
+        summary = move_company(company_id, 'shard_b', settle_seconds=0)
+    checks.append(('mudança copia para o destino e apaga a origem', summary['orders'] == 1
+                   and summary['archived_orders'] == 1
+                   and count('shard_b', orders, company_id) == 1 and count('shard_b', archived, company_id) == 1
+                   and count('shard_a', orders, company_id) == 0 and count('shard_a', archived, company_id) == 0
+                   and count('shard_a', products, company_id) == 0 and count('shard_b', events, company_id) == 2))
+
+    hot = client.get(f'/api/orders/{hot_id}', headers=shard)
+    old = client.get(f'/api/orders/{archived_id}', headers=shard)
+    checks.append(('ids antigos continuam valendo', hot.status_code == 200 and not hot.json.get('archived')
+                   and old.status_code == 200 and old.json.get('archived') is True))
+    changes = client.get('/api/orders/changes?after=0', headers=shard).json.get('events', [])
+    checks.append(('eventos apontam para os mesmos pedidos', len(changes) == 2
+                   and {event['order_id'] for event in changes} == {hot_id, archived_id}
+                   and all(event['payload']['id'] == event['order_id'] for event in changes)))
+    checks.append(('arquivamento depois da mudança', archive_order(company_id, hot_id) == 1
+                   and count('shard_b', archived, company_id) == 2))
+
+    with app.app_context():
+        try:
+            move_company(company_id, None, settle_seconds=0)
+            aborted = False
+        except ValueError:
+            aborted = True
+    checks.append(('ids em uso no destino abortam a mudança', aborted
+                   and count('shard_b', archived, company_id) == 2 and count(None, archived, company_id) == 0
+                   and client.get(f'/api/orders/{hot_id}', headers=shard).json.get('archived') is True))
+
+    with app.app_context():
+        move_company(company_id, 'shard_a', settle_seconds=0)
+    created = client.post('/api/orders/', headers=shard, json=ORDER).json['order']
+    checks.append(('volta ao shard de origem', count('shard_a', archived, company_id) == 2
+                   and count('shard_b', archived, company_id) == 0
+                   and created['id'] not in (hot_id, archived_id)
+                   and client.get(f'/api/orders/{archived_id}', headers=shard).json.get('archived') is True))
+
+    failed = False
+    for name, ok in checks:
+        print(f"{'OK  ' if ok else 'FALHA'} {name}")
+        failed = failed or not ok
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Move os dados de uma empresa (produtos, pedidos, itens, arquivo e eventos) para outro shard.
+
+Os dados são copiados com os mesmos ids (a mudança é abortada se algum já
+existir no destino), o mapa company_shards passa a apontar para o destino e,
+depois do TTL do mapa, a origem é apagada. Pause as escritas da empresa
+durante a mudança.
+
+Uso:
+    python scripts/move_company_shard.py --company 3 --to shard_a
+    python scripts/move_company_shard.py --company 3 --to principal   # de volta ao banco principal
+    python scripts/move_company_shard.py --list
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.main import app  # noqa: E402
+from src.models.models import CompanyShard  # noqa: E402
+from src.services.sharding import COPY_BATCH_SIZE, move_company  # noqa: E402
+
+PRIMARY = 'principal'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--company', type=int, help='empresa a mover')
+    parser.add_argument('--to', help=f'chave de SHARD_BINDS ou "{PRIMARY}"')
+    parser.add_argument('--batch-size', type=int, default=COPY_BATCH_SIZE)
+    parser.add_argument('--settle', type=float, help='espera antes de apagar a origem (padrão: SHARD_MAP_TTL_SECONDS)')
+    parser.add_argument('--list', action='store_true', help='mostra o mapa empresa -> shard')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.list:
+            print(f"shards: {', '.join(app.config['SHARD_BINDS']) or '(nenhum)'}")
+            for entry in CompanyShard.query.order_by(CompanyShard.company_id):
+                print(f'  empresa {entry.company_id}: {entry.bind_key}')
+            return
+
+        if args.company is None or not args.to:
+            parser.error('--company e --to são obrigatórios')
+        target = None if args.to == PRIMARY else args.to
+        print(f'movendo empresa {args.company} para {args.to}...')
+        summary = move_company(args.company, target, batch_size=args.batch_size, settle_seconds=args.settle)
+        print(
+            f"{summary['orders']} pedidos, {summary['items']} itens, {summary['products']} produtos, "
+            f"{summary['clients']} clientes, {summary['archived_orders']} pedidos arquivados e "
+            f"{summary['events']} eventos movidos de {summary['from'] or PRIMARY} para {summary['to'] or PRIMARY}"
+        )
+
+
+if __name__ == '__main__':
+    main()
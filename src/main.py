@@ -2,16 +2,34 @@ import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from src.models.models import db
+from src.models.migrations import run_migrations
 from src.routes.auth import auth_bp
 from src.routes.dashboard import dashboard_bp
 from src.routes.cnpj import cnpj_bp
 from src.routes.orders import orders_bp
 from src.routes.catalog import catalog_bp
 from src.routes.user import user_bp
+from src.routes.clients import clients_bp
+from src.routes.metrics import metrics_bp
+from src.routes.jobs import jobs_bp
+from src.routes.reports import reports_bp
+from src.routes.profiler import profiler_bp
+from src.routes.bootstrap import bootstrap_bp
+from src.services.database import init_database, bind_config
+from src.services.json_provider import FastJSONProvider
+from src.services.compression import init_compression
+from src.services.static_assets import StaticManifest, asset_response
+from src.services.instrumentation import init_sql_instrumentation
+from src.services.metrics import init_metrics
+from src.services.profiler import init_profiler
+from src.services.jobs import runner as job_runner
+from src.services.sharding import parse_shard_binds, prepare_shards
+from src.services.admission import DEFAULT_ADMISSION_LIMITS, parse_admission_limits
+from src.services import archive  # noqa: F401 (registra o job orders.archive)
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,6 +37,12 @@ load_dotenv()
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default-secret-key')
 app.config['JWT_SECRET_KEY'] = os.getenv('SECRET_KEY', 'default-secret-key')
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+app.json = FastJSONProvider(app)
+init_compression(app)
+app.config['SQL_INSTRUMENTATION_SAMPLE_RATE'] = float(os.getenv('SQL_INSTRUMENTATION_SAMPLE_RATE', 0.1))
+app.config['SLOW_REQUEST_MS'] = float(os.getenv('SLOW_REQUEST_MS', 500))
+init_sql_instrumentation(app)
 CORS(app, 
      resources={r"/api/*": {
          "origins": ["http://localhost:5173", "https://representacao-frontend.onrender.com"],
@@ -36,13 +60,64 @@ app.register_blueprint(cnpj_bp, url_prefix='/api/cnpj')
 app.register_blueprint(orders_bp, url_prefix='/api/orders')
 app.register_blueprint(catalog_bp, url_prefix='/api/catalog')
 app.register_blueprint(user_bp, url_prefix='/api/user')
+app.register_blueprint(clients_bp, url_prefix='/api/clients')
+app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+app.register_blueprint(reports_bp, url_prefix='/api/reports')
+app.register_blueprint(profiler_bp, url_prefix='/api/admin/profiles')
+app.register_blueprint(bootstrap_bp, url_prefix='/api/bootstrap')
+app.register_blueprint(metrics_bp)
 
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('SQLALCHEMY_DATABASE_URI', f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}")
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
+# Réplica somente leitura opcional para os GETs dos blueprints listados
+binds = {}
+if os.getenv('SQLALCHEMY_REPLICA_URI'):
+    binds['replica'] = bind_config(os.getenv('SQLALCHEMY_REPLICA_URI'))
+# Shards por empresa: SHARD_BINDS=chave=uri,... (empresa -> shard em company_shards, ver scripts/move_company_shard.py)
+app.config['SHARD_BINDS'] = parse_shard_binds(os.getenv('SHARD_BINDS'))
+app.config['SHARD_MAP_TTL_SECONDS'] = float(os.getenv('SHARD_MAP_TTL_SECONDS', 30))
+for key, uri in app.config['SHARD_BINDS'].items():
+    binds[key] = bind_config(uri)
+app.config['SQLALCHEMY_BINDS'] = binds
+app.config['REPLICA_READ_BLUEPRINTS'] = {'orders', 'dashboard', 'catalog', 'user', 'clients', 'reports', 'bootstrap'}
+app.config['REPLICA_STICKY_SECONDS'] = float(os.getenv('REPLICA_STICKY_SECONDS', 5))
+init_database(app, db)
+# Listagens servidas pelo caminho de leitura Core (linhas Row em vez de instâncias ORM)
+app.config['CORE_READ_ENDPOINTS'] = set(filter(None, os.getenv(
+    'CORE_READ_ENDPOINTS', 'orders.get_orders,catalog.get_products,user.get_users'
+).split(',')))
+app.config['METRICS_DIR'] = os.getenv('METRICS_DIR')
+app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+init_metrics(app, db)
+# Profiler por amostragem: cabeçalho X-Profile com o token ou PROFILER_SAMPLE_RATE > 0
+app.config['PROFILER_TOKEN'] = os.getenv('PROFILER_TOKEN')
+app.config['PROFILER_SAMPLE_RATE'] = float(os.getenv('PROFILER_SAMPLE_RATE', 0))
+if os.getenv('PROFILER_DIR'):
+    app.config['PROFILER_DIR'] = os.getenv('PROFILER_DIR')
+init_profiler(app)
+# Jobs em segundo plano: JOBS_EXECUTOR=thread|process
+app.config['JOBS_EXECUTOR'] = os.getenv('JOBS_EXECUTOR', 'thread')
+app.config['JOBS_WORKERS'] = int(os.getenv('JOBS_WORKERS', 2))
+app.config['JOBS_RETENTION_HOURS'] = float(os.getenv('JOBS_RETENTION_HOURS', 72))
+app.config['JOBS_STALE_SECONDS'] = float(os.getenv('JOBS_STALE_SECONDS', 900))
+app.config['JOBS_HEARTBEAT_SECONDS'] = float(os.getenv('JOBS_HEARTBEAT_SECONDS', 60))
+job_runner.init_app(app, db)
+# Feed /api/orders/changes só entrega eventos com pelo menos essa idade
+app.config['CHANGES_SETTLE_SECONDS'] = float(os.getenv('CHANGES_SETTLE_SECONDS', 1))
+# Pedidos mais antigos que isso são movidos para archived_orders (scripts/archive_orders.py)
+app.config['ARCHIVE_HORIZON_DAYS'] = int(os.getenv('ARCHIVE_HORIZON_DAYS', 365))
+# Controle de admissão por empresa nas rotas de sync, dashboard, exportação e relatórios
+app.config['ADMISSION_ENABLED'] = os.getenv('ADMISSION_ENABLED', 'true').lower() != 'false'
+# Ajuste por classe, ex.: ADMISSION_LIMITS_SYNC=concurrency=4,queue=8 (campos omitidos ficam no padrão)
+app.config['ADMISSION_LIMITS'] = {
+    route_class: parse_admission_limits(os.getenv(f'ADMISSION_LIMITS_{route_class.upper()}'))
+    for route_class in DEFAULT_ADMISSION_LIMITS
+    if os.getenv(f'ADMISSION_LIMITS_{route_class.upper()}')
+}
 
 with app.app_context():
     db.create_all()
+    run_migrations(db.engine)
     from src.models.models import PaymentMethod, Company, User, UserCompany, Product
     if PaymentMethod.query.count() == 0:
         payment_methods = [
@@ -94,21 +169,26 @@ with app.app_context():
         for product in products:
             db.session.add(product)
     db.session.commit()
+    prepare_shards()
+
+# Manifest da pasta estática montado na inicialização (variantes .br/.gz, ETag e cache)
+static_manifest = StaticManifest(app.static_folder, min_size=app.config['COMPRESS_MIN_SIZE'])
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
+    if app.static_folder is None:
         return "Static folder not configured", 404
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
+    asset = static_manifest.get(path) if path else None
+    if asset is None:
+        # Rotas do SPA caem no index.html
+        asset = static_manifest.get('index.html')
+        if asset is None:
             return "index.html not found", 404
+    return asset_response(asset)
 
 if __name__ == '__main__':
+    # Com o reloader, quem atende as requisições (e executa os jobs) é o processo filho
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        job_runner.start()
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
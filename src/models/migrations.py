@@ -0,0 +1,181 @@
+from datetime import datetime
+from sqlalchemy import ForeignKeyConstraint, MetaData, bindparam, func, inspect, select, text, update
+from sqlalchemy.schema import CreateTable
+from src.models.models import db
+
+# Controle das migrações já aplicadas em cada banco
+schema_migrations = db.Table(
+    'schema_migrations',
+    db.Column('id', db.String(100), primary_key=True),
+    db.Column('applied_at', db.DateTime, default=datetime.utcnow)
+)
+
+MIGRATIONS = []
+
+
+def migration(migration_id):
+    """Registra uma migração; devem ser idempotentes, pois bancos novos já nascem com o schema atual"""
+    def decorator(fn):
+        MIGRATIONS.append((migration_id, fn))
+        return fn
+    return decorator
+
+
+def _create_indexes(connection, *indexes):
+    for index in indexes:
+        index.create(connection, checkfirst=True)
+
+
+def _index(table, name):
+    return next(index for index in table.indexes if index.name == name)
+
+
+def has_column(connection, table, column):
+    return column in {c['name'] for c in inspect(connection).get_columns(table)}
+
+
+@migration('0001_order_search_indexes')
+def order_search_indexes(connection):
+    from src.models.models import Order, OrderItem
+    _create_indexes(
+        connection,
+        _index(Order.__table__, 'ix_orders_user_company_date'),
+        _index(Order.__table__, 'ix_orders_user_company_status_date'),
+        _index(Order.__table__, 'ix_orders_user_company_client_date'),
+        _index(Order.__table__, 'ix_orders_company_date'),
+        _index(OrderItem.__table__, 'ix_order_items_order_id')
+    )
+    # Substituído pelas colunas normalizadas em 0002
+    connection.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_clients_razao_social ON clients (razao_social)')
+
+
+@migration('0002_client_directory')
+def client_directory(connection):
+    from src.models.models import Order, Client
+    clients = Client.__table__
+    for column in ('cnpj_digits', 'search_name', 'search_fantasia'):
+        if not has_column(connection, 'clients', column):
+            column_type = clients.c[column].type.compile(dialect=connection.dialect)
+            connection.exec_driver_sql(f'ALTER TABLE clients ADD COLUMN {column} {column_type}')
+
+    # Backfill em lotes pela chave primária
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(clients.c.id, clients.c.cnpj, clients.c.razao_social, clients.c.nome_fantasia,
+                   clients.c.updated_at)
+            .where(clients.c.id > last_id).order_by(clients.c.id).limit(1000)
+        ).all()
+        if not rows:
+            break
+        # updated_at reenviado para o onupdate não marcar todos os clientes como alterados
+        connection.execute(
+            update(clients).where(clients.c.id == bindparam('row_id')).values(
+                cnpj_digits=bindparam('cnpj_digits'),
+                search_name=bindparam('search_name'),
+                search_fantasia=bindparam('search_fantasia'),
+                updated_at=bindparam('row_updated_at')
+            ),
+            [{'row_id': row.id, 'row_updated_at': row.updated_at,
+              **Client.search_columns(row.cnpj, row.razao_social, row.nome_fantasia)}
+             for row in rows]
+        )
+        last_id = rows[-1].id
+
+    connection.exec_driver_sql('DROP INDEX IF EXISTS ix_clients_razao_social')
+    _create_indexes(
+        connection,
+        _index(clients, 'ix_clients_cnpj_digits'),
+        _index(clients, 'ix_clients_search_name'),
+        _index(clients, 'ix_clients_search_fantasia'),
+        _index(Order.__table__, 'ix_orders_company_client_date')
+    )
+
+
+def max_id(connection, *tables):
+    """Maior id presente em qualquer uma das tabelas (0 quando vazias)"""
+    return max(connection.execute(select(func.max(table.c.id))).scalar() or 0 for table in tables)
+
+
+def raise_id_sequence(connection, table, floor):
+    """Garante que os próximos ids gerados para `table` sejam maiores que `floor`.
+
+    Necessário depois de inserir linhas com id explícito: a sequence do
+    Postgres não avança sozinha, e no SQLite (AUTOINCREMENT) ids de outras
+    tabelas, como as de arquivo, não entram no sqlite_sequence.
+    """
+    if not floor:
+        return
+    if connection.dialect.name == 'sqlite':
+        if not table.dialect_options['sqlite']['autoincrement']:
+            return  # sem AUTOINCREMENT o SQLite usa o maior id da própria tabela + 1
+        updated = connection.exec_driver_sql(
+            'UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?', (floor, table.name)
+        ).rowcount
+        if not updated:
+            connection.exec_driver_sql('INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)', (table.name, floor))
+    elif connection.dialect.name == 'postgresql':
+        sequence = connection.execute(select(func.pg_get_serial_sequence(table.name, 'id'))).scalar()
+        if sequence:
+            connection.execute(
+                text(f'SELECT setval(:sequence, GREATEST(:floor, (SELECT last_value FROM {sequence})))'),
+                {'sequence': sequence, 'floor': floor}
+            )
+
+
+def _rebuild_sqlite_table(connection, table):
+    """Recria a tabela SQLite com o DDL atual do modelo (o SQLite não altera PK/AUTOINCREMENT in-place).
+
+    FKs para tabelas ausentes neste banco (shards) ficam de fora, como em
+    sharding.shard_metadata.
+    """
+    existing = set(inspect(connection).get_table_names())
+    metadata = MetaData()
+    for other in db.metadata.sorted_tables:
+        if other is not table:
+            other.to_metadata(metadata)
+    rebuilt = table.to_metadata(metadata, name=f'_rebuild_{table.name}')
+    for constraint in [c for c in rebuilt.constraints if isinstance(c, ForeignKeyConstraint)]:
+        if constraint.elements[0].target_fullname.split('.')[0] not in existing:
+            rebuilt.constraints.discard(constraint)
+            for element in constraint.elements:
+                element.parent.foreign_keys.discard(element)
+                rebuilt.foreign_keys.discard(element)
+
+    columns = ', '.join(column['name'] for column in inspect(connection).get_columns(table.name))
+    connection.execute(CreateTable(rebuilt))
+    connection.exec_driver_sql(f'INSERT INTO {rebuilt.name} ({columns}) SELECT {columns} FROM {table.name}')
+    connection.exec_driver_sql(f'DROP TABLE {table.name}')
+    connection.exec_driver_sql(f'ALTER TABLE {rebuilt.name} RENAME TO {table.name}')
+    _create_indexes(connection, *table.indexes)
+
+
+@migration('0003_sqlite_autoincrement_order_ids')
+def sqlite_autoincrement_order_ids(connection):
+    # No Postgres as sequences nunca devolvem ids já usados
+    if connection.dialect.name != 'sqlite':
+        return
+    from src.models.models import Order, OrderItem, ArchivedOrder, ArchivedOrderItem
+    for table, archived in ((Order.__table__, ArchivedOrder.__table__), (OrderItem.__table__, ArchivedOrderItem.__table__)):
+        sql = connection.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+        ).scalar()
+        if 'AUTOINCREMENT' not in sql.upper():
+            _rebuild_sqlite_table(connection, table)
+
+        # Ids já arquivados (maiores que os da tabela quente) também não voltam
+        raise_id_sequence(connection, table, max_id(connection, table, archived))
+
+
+def run_migrations(engine):
+    """Aplica, em ordem, as migrações pendentes no engine informado"""
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.begin() as connection:
+        applied = {row.id for row in connection.execute(schema_migrations.select())}
+
+    for migration_id, fn in MIGRATIONS:
+        if migration_id in applied:
+            continue
+        with engine.begin() as connection:
+            fn(connection)
+            connection.execute(schema_migrations.insert().values(id=migration_id))
@@ -1,8 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload, selectinload
 from datetime import datetime
+from uuid import uuid4
 import bcrypt
+from src.services.db_routing import RoutingSession
+from src.services.search import only_digits, normalize_name
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -66,6 +71,17 @@ class UserCompany(db.Model):
     user = db.relationship('User', back_populates='user_companies')
     company = db.relationship('Company', back_populates='user_companies')
 
+class CompanyShard(db.Model):
+    """Shard (chave de SHARD_BINDS) com os pedidos, itens, clientes e produtos da empresa.
+
+    Empresas sem linha aqui ficam no banco principal.
+    """
+    __tablename__ = 'company_shards'
+
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), primary_key=True)
+    bind_key = db.Column(db.String(50), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class Client(db.Model):
     __tablename__ = 'clients'
     
@@ -73,11 +89,34 @@ class Client(db.Model):
     cnpj = db.Column(db.String(18), unique=True, nullable=False)
     razao_social = db.Column(db.String(255), nullable=False)
     nome_fantasia = db.Column(db.String(255))
+    # Colunas normalizadas para o autocomplete (mantidas por refresh_search_columns)
+    cnpj_digits = db.Column(db.String(14))
+    search_name = db.Column(db.String(255))
+    search_fantasia = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relacionamentos
     orders = db.relationship('Order', back_populates='client', cascade='all, delete-orphan')
+    
+    __table_args__ = (
+        db.Index('ix_clients_cnpj_digits', 'cnpj_digits'),
+        db.Index('ix_clients_search_name', 'search_name'),
+        db.Index('ix_clients_search_fantasia', 'search_fantasia'),
+    )
+
+    @staticmethod
+    def search_columns(cnpj, razao_social, nome_fantasia):
+        """Valores normalizados de busca para os dados informados"""
+        return {
+            'cnpj_digits': only_digits(cnpj),
+            'search_name': normalize_name(razao_social),
+            'search_fantasia': normalize_name(nome_fantasia) or None
+        }
+
+    def refresh_search_columns(self):
+        for key, value in self.search_columns(self.cnpj, self.razao_social, self.nome_fantasia).items():
+            setattr(self, key, value)
 
     def to_dict(self):
         return {
@@ -161,6 +200,17 @@ class Order(db.Model):
     client = db.relationship('Client', back_populates='orders')
     payment_method = db.relationship('PaymentMethod', back_populates='orders')
     order_items = db.relationship('OrderItem', back_populates='order', cascade='all, delete-orphan')
+    
+    # Cada combinação de filtro da busca de pedidos é atendida por um range scan
+    __table_args__ = (
+        db.Index('ix_orders_user_company_date', 'user_id', 'company_id', 'order_date'),
+        db.Index('ix_orders_user_company_status_date', 'user_id', 'company_id', 'status', 'order_date'),
+        db.Index('ix_orders_user_company_client_date', 'user_id', 'company_id', 'client_id', 'order_date'),
+        db.Index('ix_orders_company_date', 'company_id', 'order_date'),
+        db.Index('ix_orders_company_client_date', 'company_id', 'client_id', 'order_date'),
+        # Pedidos arquivados mantêm o id: no SQLite os ids não podem ser reaproveitados
+        {'sqlite_autoincrement': True}
+    )
 
     def to_dict(self):
         return {
@@ -194,6 +244,8 @@ class OrderItem(db.Model):
     # Relacionamentos
     order = db.relationship('Order', back_populates='order_items')
     product = db.relationship('Product', back_populates='order_items')
+    
+    __table_args__ = (db.Index('ix_order_items_order_id', 'order_id'), {'sqlite_autoincrement': True})
 
     def to_dict(self):
         return {
@@ -207,3 +259,152 @@ class OrderItem(db.Model):
             'product': self.product.to_dict() if self.product else None
         }
 
+class ArchivedOrder(db.Model):
+    """Pedido movido para o arquivo frio (mesmas colunas de Order, sem os índices de busca)"""
+    __tablename__ = 'archived_orders'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=False)
+    payment_method_id = db.Column(db.Integer, db.ForeignKey('payment_methods.id'))
+    discount_percentage = db.Column(db.Numeric(5, 2), default=0.00)
+    total_value = db.Column(db.Numeric(10, 2), nullable=False)
+    status = db.Column(db.String(50), nullable=False)
+    order_date = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relacionamentos
+    client = db.relationship('Client')
+    payment_method = db.relationship('PaymentMethod')
+    order_items = db.relationship('ArchivedOrderItem', back_populates='order')
+    
+    __table_args__ = (
+        db.Index('ix_archived_orders_user_company_date', 'user_id', 'company_id', 'order_date'),
+        db.Index('ix_archived_orders_company_date', 'company_id', 'order_date'),
+    )
+
+    def to_dict(self):
+        data = Order.to_dict(self)
+        data['archived'] = True
+        return data
+
+class ArchivedOrderItem(db.Model):
+    __tablename__ = 'archived_order_items'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('archived_orders.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    quantity = db.Column(db.JSON, nullable=False)
+    unit_value = db.Column(db.Numeric(10, 2), nullable=False)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    
+    # Relacionamentos
+    order = db.relationship('ArchivedOrder', back_populates='order_items')
+    product = db.relationship('Product')
+    
+    __table_args__ = (db.Index('ix_archived_order_items_order_id', 'order_id'),)
+
+    def to_dict(self):
+        return OrderItem.to_dict(self)
+
+class OrderEvent(db.Model):
+    """Outbox de mudanças de pedidos, gravado na mesma transação que o pedido.
+
+    O id é o cursor do feed; order_id não tem FK para que o histórico
+    sobreviva ao arquivamento do pedido.
+    """
+    __tablename__ = 'order_events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
+    order_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    event_type = db.Column(db.String(50), nullable=False)  # order.created
+    payload = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (db.Index('ix_order_events_company_id', 'company_id', 'id'),)
+
+    @classmethod
+    def for_order(cls, order, event_type):
+        return cls(
+            company_id=order.company_id,
+            order_id=order.id,
+            user_id=order.user_id,
+            event_type=event_type,
+            payload={
+                'id': order.id,
+                'user_id': order.user_id,
+                'client_id': order.client_id,
+                'status': order.status,
+                'total_value': float(order.total_value) if order.total_value else 0,
+                'order_date': order.order_date.isoformat() if order.order_date else None
+            }
+        )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'company_id': self.company_id,
+            'order_id': self.order_id,
+            'user_id': self.user_id,
+            'event_type': self.event_type,
+            'payload': self.payload,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid4().hex)
+    kind = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    progress = db.Column(db.Float, default=0.0)
+    payload = db.Column(db.JSON)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, default=0)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    # Atualizado a cada progresso; jobs "running" sem heartbeat recente são recuperados
+    heartbeat_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_jobs_status_created', 'status', 'created_at'),
+        db.Index('ix_jobs_user_created', 'user_id', 'created_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress or 0,
+            'error': self.error,
+            'attempts': self.attempts or 0,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+def order_load_options(model=None):
+    """Opções de carregamento que trazem cliente, pagamento, itens e produtos sem N+1 (Order ou ArchivedOrder)"""
+    model = model or Order
+    item_model = ArchivedOrderItem if model is ArchivedOrder else OrderItem
+    return (
+        joinedload(model.client),
+        joinedload(model.payment_method),
+        selectinload(model.order_items).joinedload(item_model.product)
+    )
+
+@event.listens_for(Client, 'before_insert')
+@event.listens_for(Client, 'before_update')
+def _refresh_client_search_columns(mapper, connection, target):
+    target.refresh_search_columns()
@@ -0,0 +1,26 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from src.routes.auth import jwt_login_required
+from src.services.bootstrap import SECTIONS, build_bootstrap
+from src.services.tenant import get_current_company_id
+
+bootstrap_bp = Blueprint('bootstrap', __name__)
+
+@bootstrap_bp.route('', methods=['GET'])
+@jwt_login_required
+def get_bootstrap():
+    """Usuário, empresa, catálogo, formas de pagamento ativas e clientes recentes numa só resposta.
+
+    O cliente envia as versões que já tem (?catalog=<versão>&user=<versão>...) e
+    recebe dados só das seções que mudaram; as demais vêm apenas com a versão.
+    """
+    try:
+        company_id = get_current_company_id()
+        if company_id is None:
+            return jsonify({'error': 'Empresa não selecionada'}), 400
+        
+        known_versions = {name: request.args[name] for name in SECTIONS if request.args.get(name)}
+        return jsonify(build_bootstrap(get_jwt_identity(), company_id, known_versions)), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
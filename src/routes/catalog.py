@@ -1,8 +1,11 @@
 from flask import Blueprint, jsonify, request
-from src.models.models import Product, PaymentMethod, db, UserCompany
+from src.models.models import Product, PaymentMethod, db
 from src.routes.auth import jwt_login_required
+from src.services.tenant import get_current_company_id
+from src.services.sharding import sync_reference_tables
+from src.services.read_path import PRODUCT, core_read_enabled, json_response, products_json
+from src.services.upserts import insert_ignoring_conflicts
 from sqlalchemy import and_
-from flask_jwt_extended import get_jwt_identity
 
 catalog_bp = Blueprint('catalog', __name__)
 
@@ -11,11 +14,12 @@ catalog_bp = Blueprint('catalog', __name__)
 def get_products():
     """Lista todos os produtos da empresa selecionada"""
     try:
-        user_id = get_jwt_identity()
-        user_company = UserCompany.query.filter_by(user_id=user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
-        company_id = user_company.company_id
+        
+        if core_read_enabled():
+            return json_response(products_json(company_id)), 200
         
         products = Product.query.filter_by(company_id=company_id).all()
         
@@ -29,11 +33,9 @@ def get_products():
 def create_product():
     """Cria um novo produto"""
     try:
-        user_id = get_jwt_identity()
-        user_company = UserCompany.query.filter_by(user_id=user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
-        company_id = user_company.company_id
         
         data = request.json
         if not data:
@@ -44,27 +46,22 @@ def create_product():
             if not data.get(field):
                 return jsonify({'error': f'{field} é obrigatório'}), 400
         
-        existing_product = Product.query.filter_by(
-            company_id=company_id,
-            code=data['code']
-        ).first()
-        if existing_product:
+        # Verificação e inserção num único comando: cadastros simultâneos do mesmo código não estouram a constraint
+        inserted = insert_ignoring_conflicts(Product, [{
+            'company_id': company_id,
+            'code': data['code'],
+            'description': data['description'],
+            'value': data['value'],
+            'sizes': data.get('sizes', [])
+        }], ['company_id', 'code'], returning=PRODUCT.columns)
+        if not inserted:
+            db.session.rollback()
             return jsonify({'error': 'Código do produto já existe nesta empresa'}), 400
-        
-        product = Product(
-            company_id=company_id,
-            code=data['code'],
-            description=data['description'],
-            value=data['value'],
-            sizes=data.get('sizes', [])
-        )
-        
-        db.session.add(product)
         db.session.commit()
         
         return jsonify({
             'message': 'Produto criado com sucesso',
-            'product': product.to_dict()
+            'product': PRODUCT.to_dict(inserted[0])
         }), 201
         
     except Exception as e:
@@ -76,9 +73,8 @@ def create_product():
 def get_payment_methods():
     """Lista todas as formas de pagamento ativas"""
     try:
-        user_id = get_jwt_identity()
-        user_company = UserCompany.query.filter_by(user_id=user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
         
         payment_methods = PaymentMethod.query.filter_by(is_active=True).all()
@@ -93,9 +89,8 @@ def get_payment_methods():
 def create_payment_method():
     """Cria uma nova forma de pagamento"""
     try:
-        user_id = get_jwt_identity()
-        user_company = UserCompany.query.filter_by(user_id=user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
         
         data = request.json
@@ -113,6 +108,8 @@ def create_payment_method():
         
         db.session.add(payment_method)
         db.session.commit()
+        # Formas de pagamento são replicadas nos shards (joins com pedidos)
+        sync_reference_tables()
         
         return jsonify({
             'message': 'Forma de pagamento criada com sucesso',
@@ -0,0 +1,74 @@
+from flask import Blueprint, jsonify, request
+from src.models.models import Client, Order, db
+from src.routes.auth import jwt_login_required
+from src.services.tenant import get_current_company_id
+from src.services.search import prefix_range, only_digits, normalize_name
+from sqlalchemy import func, or_, select
+
+clients_bp = Blueprint('clients', __name__)
+
+DIRECTORY_DEFAULT_LIMIT = 20
+DIRECTORY_MAX_LIMIT = 100
+MIN_QUERY_LENGTH = 2
+
+@clients_bp.route('/', methods=['GET'])
+@jwt_login_required
+def search_clients():
+    """Autocomplete de clientes por prefixo do CNPJ ou da razão social/nome fantasia"""
+    try:
+        company_id = get_current_company_id()
+        if company_id is None:
+            return jsonify({'error': 'Empresa não selecionada'}), 400
+        
+        query = request.args.get('q', '').strip()
+        try:
+            limit = min(int(request.args.get('limit', DIRECTORY_DEFAULT_LIMIT)), DIRECTORY_MAX_LIMIT)
+        except ValueError:
+            return jsonify({'error': 'limit inválido'}), 400
+        if limit < 1:
+            return jsonify({'error': 'limit inválido'}), 400
+        
+        # Só dígitos e pontuação de CNPJ: busca pelo CNPJ; qualquer letra: busca pelo nome
+        if query and not any(ch.isalpha() for ch in query):
+            term = only_digits(query)
+            condition = prefix_range(Client.cnpj_digits, term)
+            order_by = Client.cnpj_digits
+        else:
+            term = normalize_name(query)
+            condition = or_(
+                prefix_range(Client.search_name, term),
+                prefix_range(Client.search_fantasia, term)
+            ) if term else None
+            order_by = Client.search_name
+        
+        if len(term) < MIN_QUERY_LENGTH:
+            return jsonify({'error': f'Informe ao menos {MIN_QUERY_LENGTH} caracteres'}), 400
+        
+        clients = db.session.scalars(
+            select(Client).where(condition).order_by(order_by).limit(limit)
+        ).all()
+        
+        # Estatísticas da empresa para os clientes encontrados, num único GROUP BY
+        stats = {}
+        if clients:
+            stats = {
+                client_id: (last_order_date, order_count)
+                for client_id, last_order_date, order_count in db.session.execute(
+                    select(Order.client_id, func.max(Order.order_date), func.count(Order.id))
+                    .where(Order.company_id == company_id, Order.client_id.in_([c.id for c in clients]))
+                    .group_by(Order.client_id)
+                )
+            }
+        
+        results = []
+        for client in clients:
+            last_order_date, order_count = stats.get(client.id, (None, 0))
+            data = client.to_dict()
+            data['last_order_date'] = last_order_date
+            data['order_count'] = order_count
+            results.append(data)
+        
+        return jsonify(results), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,8 +1,9 @@
 from flask import Blueprint, jsonify, request
 import requests
+from time import perf_counter
 from src.routes.auth import jwt_login_required
-from src.models.models import UserCompany
-from flask_jwt_extended import get_jwt_identity
+from src.services.tenant import get_current_company_id
+from src.services.metrics import observe_outbound
 
 cnpj_bp = Blueprint('cnpj', __name__)
 
@@ -11,9 +12,8 @@ cnpj_bp = Blueprint('cnpj', __name__)
 def consultar_cnpj():
     """Consulta dados de CNPJ usando a API ReceitaWS"""
     try:
-        user_id = get_jwt_identity()
-        user_company = UserCompany.query.filter_by(user_id=user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
         
         data = request.json
@@ -25,7 +25,16 @@ def consultar_cnpj():
             return jsonify({'error': 'CNPJ inválido'}), 400
         
         url = f'https://www.receitaws.com.br/v1/cnpj/{cnpj}'
-        response = requests.get(url, timeout=10)
+        started = perf_counter()
+        try:
+            response = requests.get(url, timeout=10)
+        except requests.exceptions.Timeout:
+            observe_outbound('receitaws', 'timeout', perf_counter() - started)
+            raise
+        except requests.exceptions.RequestException:
+            observe_outbound('receitaws', 'error', perf_counter() - started)
+            raise
+        observe_outbound('receitaws', str(response.status_code), perf_counter() - started)
         
         if response.status_code != 200:
             return jsonify({'error': 'Erro ao consultar CNPJ'}), 500
@@ -1,25 +1,26 @@
 from flask import Blueprint, jsonify
 from src.models.models import Order, Client, db
 from src.routes.auth import jwt_login_required
+from src.services.admission import admission_controlled
+from src.services.tenant import get_current_company_id
 from datetime import datetime, timedelta
 from sqlalchemy import func, and_
 from flask_jwt_extended import get_jwt_identity
-from src.models.models import UserCompany, Company
+from src.models.models import Company, order_load_options
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
 @dashboard_bp.route('/metrics', methods=['GET'])
 @jwt_login_required
+@admission_controlled('dashboard')
 def get_dashboard_metrics():
     """Retorna métricas para o dashboard"""
     try:
         user_id = get_jwt_identity()
         
-        # Obter company_id da associação UserCompany
-        user_company = UserCompany.query.filter_by(user_id=user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
-        company_id = user_company.company_id
         
         # Data de hoje e ontem
         today = datetime.now().date()
@@ -85,7 +86,7 @@ def get_dashboard_metrics():
             value_variation = 100
         
         # Últimos 5 pedidos
-        latest_orders = Order.query.filter(
+        latest_orders = Order.query.options(*order_load_options()).filter(
             and_(
                 Order.user_id == user_id,
                 Order.company_id == company_id
@@ -109,16 +110,15 @@ def get_dashboard_metrics():
 
 @dashboard_bp.route('/pending-orders-count', methods=['GET'])
 @jwt_login_required
+@admission_controlled('dashboard')
 def get_pending_orders_count():
     """Retorna a contagem de pedidos pendentes no banco"""
     try:
         user_id = get_jwt_identity()
         
-        # Obter company_id da associação UserCompany
-        user_company = UserCompany.query.filter_by(user_id=user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
-        company_id = user_company.company_id
         
         pending_count = Order.query.filter(
             and_(
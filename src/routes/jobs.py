@@ -0,0 +1,60 @@
+from flask import Blueprint, jsonify
+from src.models.models import Job
+from src.routes.auth import jwt_login_required
+from src.services.jobs import FAILED, SUCCEEDED
+from flask_jwt_extended import get_jwt_identity
+
+jobs_bp = Blueprint('jobs', __name__)
+
+JOBS_LIST_LIMIT = 50
+
+def _user_job(job_id):
+    # Jobs só são visíveis para quem os enfileirou
+    return Job.query.filter_by(id=job_id, user_id=get_jwt_identity()).first()
+
+@jobs_bp.route('/', methods=['GET'])
+@jwt_login_required
+def get_jobs():
+    """Lista os jobs mais recentes do usuário"""
+    try:
+        jobs = Job.query.filter_by(user_id=get_jwt_identity()).order_by(
+            Job.created_at.desc()
+        ).limit(JOBS_LIST_LIMIT).all()
+
+        return jsonify([job.to_dict() for job in jobs]), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@jwt_login_required
+def get_job(job_id):
+    """Status e progresso de um job"""
+    try:
+        job = _user_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job não encontrado'}), 404
+
+        return jsonify(job.to_dict()), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@jobs_bp.route('/<job_id>/result', methods=['GET'])
+@jwt_login_required
+def get_job_result(job_id):
+    """Resultado de um job concluído (409 enquanto estiver na fila ou em execução)"""
+    try:
+        job = _user_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job não encontrado'}), 404
+
+        if job.status == FAILED:
+            return jsonify({'error': job.error, 'status': job.status}), 500
+        if job.status != SUCCEEDED:
+            return jsonify({'error': 'Job ainda não concluído', 'status': job.status, 'progress': job.progress or 0}), 409
+
+        return jsonify({'status': job.status, 'result': job.result}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
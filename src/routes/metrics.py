@@ -0,0 +1,14 @@
+import hmac
+from flask import Blueprint, Response, current_app, jsonify, request
+from src.services.metrics import registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Exporta as métricas no formato texto do Prometheus"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and not hmac.compare_digest(request.headers.get('X-Metrics-Token', ''), token):
+        return jsonify({'error': 'Acesso negado'}), 403
+
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
@@ -1,12 +1,152 @@
-from flask import Blueprint, jsonify, request
-from src.models.models import Order, OrderItem, Client, Product, PaymentMethod, db, UserCompany
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from src.models.models import (
+    Order, OrderItem, Client, Product, PaymentMethod, db, ArchivedOrder, OrderEvent,
+    order_load_options
+)
 from src.routes.auth import jwt_login_required
-from sqlalchemy import and_
+from src.services.search import prefix_range, only_digits, normalize_name
+from src.services.jobs import enqueue_response, job_handler
+from src.services.admission import admission_controlled
+from src.services.tenant import get_current_company_id
+from src.services.read_path import core_read_enabled, json_response, orders_json
+from src.services.upserts import ensure_clients, products_by_code
+from sqlalchemy import and_, select
 from decimal import Decimal
+from datetime import datetime, timedelta
 from flask_jwt_extended import get_jwt_identity
+import csv
+import io
+import tempfile
+import time
 
 orders_bp = Blueprint('orders', __name__)
 
+EXPORT_COLUMNS = [
+    'pedido_id', 'data_pedido', 'status', 'representante_id', 'cliente_cnpj',
+    'cliente_razao_social', 'forma_pagamento', 'desconto_percentual', 'valor_total_pedido',
+    'produto_codigo', 'produto_descricao', 'tamanho', 'quantidade', 'valor_unitario', 'valor_item'
+]
+EXPORT_BATCH_SIZE = 1000
+SEARCH_DEFAULT_LIMIT = 50
+SEARCH_MAX_LIMIT = 200
+EXPORT_FLUSH_BYTES = 64 * 1024
+SYNC_PROGRESS_EVERY = 50
+BATCH_MAX_IDS = 100
+CHANGES_DEFAULT_LIMIT = 100
+CHANGES_MAX_LIMIT = 1000
+CHANGES_MAX_WAIT = 30
+CHANGES_POLL_INTERVAL = 0.5
+
+def parse_date(value):
+    """Converte AAAA-MM-DD em datetime (None quando ausente)"""
+    if not value:
+        return None
+    return datetime.strptime(value, '%Y-%m-%d')
+
+def build_order_search(user_id, company_id, args):
+    """Monta o SELECT da busca de pedidos; cada combinação de filtros usa um dos índices de Order"""
+    stmt = select(Order).where(Order.user_id == user_id, Order.company_id == company_id)
+
+    date_from = parse_date(args.get('date_from'))
+    date_to = parse_date(args.get('date_to'))
+    if date_from:
+        stmt = stmt.where(Order.order_date >= date_from)
+    if date_to:
+        stmt = stmt.where(Order.order_date < date_to + timedelta(days=1))
+    if args.get('status'):
+        stmt = stmt.where(Order.status == args['status'])
+    if args.get('client_id'):
+        stmt = stmt.where(Order.client_id == int(args['client_id']))
+    if only_digits(args.get('client_cnpj')):
+        stmt = stmt.where(Order.client_id.in_(
+            select(Client.id).where(prefix_range(Client.cnpj_digits, only_digits(args['client_cnpj'])))
+        ))
+    if normalize_name(args.get('client_name')):
+        stmt = stmt.where(Order.client_id.in_(
+            select(Client.id).where(prefix_range(Client.search_name, normalize_name(args['client_name'])))
+        ))
+
+    return stmt.order_by(Order.order_date.desc())
+
+def _export_statement(company_id, args):
+    """Monta o SELECT da exportação (uma linha por item) com os filtros da query string"""
+    stmt = select(
+        Order.id, Order.order_date, Order.status, Order.user_id, Client.cnpj, Client.razao_social,
+        PaymentMethod.name, Order.discount_percentage, Order.total_value, Product.code,
+        Product.description, OrderItem.quantity, OrderItem.unit_value
+    ).select_from(Order).join(
+        OrderItem, OrderItem.order_id == Order.id
+    ).join(
+        Product, Product.id == OrderItem.product_id
+    ).join(
+        Client, Client.id == Order.client_id
+    ).outerjoin(
+        PaymentMethod, PaymentMethod.id == Order.payment_method_id
+    ).where(Order.company_id == company_id)
+
+    date_from = parse_date(args.get('date_from'))
+    date_to = parse_date(args.get('date_to'))
+    if date_from:
+        stmt = stmt.where(Order.order_date >= date_from)
+    if date_to:
+        stmt = stmt.where(Order.order_date < date_to + timedelta(days=1))
+    if args.get('status'):
+        stmt = stmt.where(Order.status == args['status'])
+    if args.get('client_id'):
+        stmt = stmt.where(Order.client_id == int(args['client_id']))
+    if args.get('client_cnpj'):
+        stmt = stmt.where(Client.cnpj == args['client_cnpj'])
+
+    return stmt.order_by(Order.order_date, Order.id, OrderItem.id).execution_options(
+        yield_per=EXPORT_BATCH_SIZE
+    )
+
+def _export_rows(stmt):
+    """Percorre o cursor em lotes e expande cada item em uma linha por tamanho"""
+    result = db.session.execute(stmt)
+    for partition in result.partitions():
+        for (order_id, order_date, status, user_id, cnpj, razao_social, payment_method,
+             discount, total_value, code, description, quantity, unit_value) in partition:
+            for size, qty in (quantity or {}).items():
+                if not qty:
+                    continue
+                yield [
+                    order_id, order_date.isoformat() if order_date else '', status, user_id, cnpj,
+                    razao_social, payment_method or '', discount or 0, total_value, code,
+                    description, size, qty, unit_value, unit_value * qty
+                ]
+
+def _stream_csv(stmt):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM para o Excel reconhecer UTF-8
+    buffer.write('\ufeff')
+    writer.writerow(EXPORT_COLUMNS)
+    for row in _export_rows(stmt):
+        writer.writerow(row)
+        if buffer.tell() >= EXPORT_FLUSH_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+def _stream_xlsx(stmt):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Pedidos')
+    sheet.append(EXPORT_COLUMNS)
+    for row in _export_rows(stmt):
+        sheet.append(row)
+    with tempfile.TemporaryFile() as f:
+        workbook.save(f)
+        f.seek(0)
+        while True:
+            chunk = f.read(EXPORT_FLUSH_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
 @orders_bp.route('/', methods=['GET'])
 @jwt_login_required
 def get_orders():
@@ -14,24 +154,59 @@ def get_orders():
     try:
         user_id = get_jwt_identity()
         
-        # Obter company_id da associação UserCompany
-        user_company = UserCompany.query.filter_by(user_id=user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
-        company_id = user_company.company_id
         
-        orders = Order.query.filter(
+        if core_read_enabled():
+            return json_response(orders_json(user_id, company_id)), 200
+        
+        orders = Order.query.options(*order_load_options()).filter(
             and_(
                 Order.user_id == user_id,
                 Order.company_id == company_id
             )
-        ).order_by(Order.order_date.desc()).all()
+        ).order_by(Order.order_date.desc(), Order.id.desc()).all()
         
         return jsonify([order.to_dict() for order in orders]), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@orders_bp.route('/search', methods=['GET'])
+@jwt_login_required
+def search_orders():
+    """Busca pedidos do usuário por cliente (id, prefixo de CNPJ ou razão social), status e período"""
+    try:
+        user_id = get_jwt_identity()
+        
+        company_id = get_current_company_id()
+        if company_id is None:
+            return jsonify({'error': 'Empresa não selecionada'}), 400
+        
+        try:
+            stmt = build_order_search(user_id, company_id, request.args)
+            limit = min(int(request.args.get('limit', SEARCH_DEFAULT_LIMIT)), SEARCH_MAX_LIMIT)
+            offset = int(request.args.get('offset', 0))
+        except ValueError:
+            return jsonify({'error': 'Filtros inválidos (datas em AAAA-MM-DD, ids e paginação numéricos)'}), 400
+        if limit < 1 or offset < 0:
+            return jsonify({'error': 'Paginação inválida'}), 400
+        
+        orders = db.session.scalars(
+            stmt.options(*order_load_options()).limit(limit + 1).offset(offset)
+        ).unique().all()
+        
+        return jsonify({
+            'orders': [order.to_dict() for order in orders[:limit]],
+            'limit': limit,
+            'offset': offset,
+            'has_more': len(orders) > limit
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @orders_bp.route('/', methods=['POST'])
 @jwt_login_required
 def create_order():
@@ -39,11 +214,9 @@ def create_order():
     try:
         user_id = get_jwt_identity()
         
-        # Obter company_id da associação UserCompany
-        user_company = UserCompany.query.filter_by(user_id=user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
-        company_id = user_company.company_id
         
         data = request.json
         
@@ -71,85 +244,205 @@ def create_order():
         if not has_valid_item:
             return jsonify({'error': 'Pelo menos um item deve ter quantidade maior que zero'}), 400
         
-        client = Client.query.filter_by(cnpj=data['client_cnpj']).first()
-        if not client:
-            client = Client(
-                cnpj=data['client_cnpj'],
-                razao_social=data['client_razao_social'],
-                nome_fantasia=data.get('client_nome_fantasia', '')
-            )
-            db.session.add(client)
-            db.session.flush()
+        client = ensure_clients({
+            data['client_cnpj']: (data['client_razao_social'], data.get('client_nome_fantasia', ''))
+        })[data['client_cnpj']]
         
-        payment_method_id = None
+        payment_method = None
         if data.get('payment_method_id'):
-            payment_method = PaymentMethod.query.get(data['payment_method_id'])
-            if payment_method and payment_method.is_active:
-                payment_method_id = payment_method.id
+            payment_method = db.session.get(PaymentMethod, data['payment_method_id'])
+            if payment_method and not payment_method.is_active:
+                payment_method = None
+        
+        # Todos os produtos do pedido numa consulta
+        products = products_by_code(company_id, (item_data['code'] for item_data in data['items']))
         
         total_value = Decimal('0.00')
-        order_items_data = []
+        order_items = []
         
         for item_data in data['items']:
-            product = Product.query.filter_by(
-                company_id=company_id,
-                code=item_data['code']
-            ).first()
+            product = products.get(item_data['code'])
             
             if not product:
                 return jsonify({'error': f'Produto {item_data["code"]} não encontrado'}), 404
             
             item_total_qty = sum(item_data['quantity'].values())
             if item_total_qty > 0:
-                item_value = Decimal(str(item_data.get('unit_value', product.value))) * item_total_qty
-                total_value += item_value
+                unit_value = Decimal(str(item_data.get('unit_value', product.value)))
+                total_value += unit_value * item_total_qty
                 
-                order_items_data.append({
-                    'product': product,
-                    'quantity': item_data['quantity'],
-                    'unit_value': Decimal(str(item_data.get('unit_value', product.value)))
-                })
+                order_items.append(OrderItem(
+                    product=product,
+                    quantity=item_data['quantity'],
+                    unit_value=unit_value
+                ))
         
         discount_percentage = Decimal(str(data.get('discount_percentage', 0)))
         if discount_percentage > 0:
             discount_amount = total_value * (discount_percentage / 100)
             total_value -= discount_amount
         
+        # Relacionamentos preenchidos com os objetos já carregados: o flush grava os
+        # itens num único INSERT em lote e o to_dict() não dispara nenhuma consulta
         order = Order(
             user_id=user_id,
             company_id=company_id,
-            client_id=client.id,
-            payment_method_id=payment_method_id,
+            client=client,
+            payment_method=payment_method,
             discount_percentage=discount_percentage,
             total_value=total_value,
-            status='Concluído'
+            status='Concluído',
+            order_items=order_items
         )
         
         db.session.add(order)
         db.session.flush()
+        db.session.add(OrderEvent.for_order(order, 'order.created'))
         
-        for item_data in order_items_data:
-            order_item = OrderItem(
-                order_id=order.id,
-                product_id=item_data['product'].id,
-                quantity=item_data['quantity'],
-                unit_value=item_data['unit_value']
-            )
-            db.session.add(order_item)
-        
+        # Serializado antes do commit, que expira os objetos
+        order_data = order.to_dict()
         db.session.commit()
         
-        order = Order.query.get(order.id)
-        
         return jsonify({
             'message': 'Pedido criado com sucesso',
-            'order': order.to_dict()
+            'order': order_data
         }), 201
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@orders_bp.route('/batch', methods=['GET'])
+@jwt_login_required
+def get_orders_batch():
+    """Busca vários pedidos de uma vez (?ids=1,2,3), na ordem pedida, incluindo arquivados"""
+    try:
+        user_id = get_jwt_identity()
+        company_id = get_current_company_id()
+        if not company_id:
+            return jsonify({'error': 'Empresa não selecionada'}), 400
+        
+        try:
+            order_ids = list(dict.fromkeys(int(value) for value in request.args.get('ids', '').split(',') if value.strip()))
+        except ValueError:
+            return jsonify({'error': 'ids inválidos'}), 400
+        if not order_ids:
+            return jsonify({'error': 'ids é obrigatório'}), 400
+        if len(order_ids) > BATCH_MAX_IDS:
+            return jsonify({'error': f'No máximo {BATCH_MAX_IDS} pedidos por requisição'}), 400
+        
+        found = {}
+        for model in (Order, ArchivedOrder):
+            missing = [order_id for order_id in order_ids if order_id not in found]
+            if not missing:
+                break
+            orders = model.query.options(*order_load_options(model)).filter(
+                model.id.in_(missing),
+                model.user_id == user_id,
+                model.company_id == company_id
+            ).all()
+            found.update((order.id, order) for order in orders)
+        
+        return jsonify({
+            'orders': [found[order_id].to_dict() for order_id in order_ids if order_id in found],
+            'not_found': [order_id for order_id in order_ids if order_id not in found]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@orders_bp.route('/changes', methods=['GET'])
+@jwt_login_required
+def get_order_changes():
+    """Feed de mudanças de pedidos da empresa a partir de um cursor (?after=<id>).
+
+    Com ?wait=<segundos> a requisição espera (long-polling) até surgir algum
+    evento ou o tempo acabar. Eventos mais novos que CHANGES_SETTLE_SECONDS
+    ficam para a próxima chamada, para que transações ainda não confirmadas
+    com id menor não sejam puladas pelo cursor.
+    """
+    try:
+        company_id = get_current_company_id()
+        if not company_id:
+            return jsonify({'error': 'Empresa não selecionada'}), 400
+        
+        try:
+            after = int(request.args.get('after', 0))
+            limit = min(int(request.args.get('limit', CHANGES_DEFAULT_LIMIT)), CHANGES_MAX_LIMIT)
+            wait = min(float(request.args.get('wait', 0)), CHANGES_MAX_WAIT)
+        except ValueError:
+            return jsonify({'error': 'Parâmetros inválidos'}), 400
+        if limit < 1:
+            return jsonify({'error': 'limit deve ser maior que zero'}), 400
+        
+        settle = timedelta(seconds=current_app.config.get('CHANGES_SETTLE_SECONDS', 1))
+        deadline = time.monotonic() + wait
+        while True:
+            events = OrderEvent.query.filter(
+                OrderEvent.company_id == company_id,
+                OrderEvent.id > after,
+                OrderEvent.created_at <= datetime.utcnow() - settle
+            ).order_by(OrderEvent.id).limit(limit + 1).all()
+            if events or time.monotonic() >= deadline:
+                break
+            # Libera a conexão (e o snapshot) entre as consultas
+            db.session.rollback()
+            time.sleep(min(CHANGES_POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
+        
+        has_more = len(events) > limit
+        events = events[:limit]
+        return jsonify({
+            'events': [event.to_dict() for event in events],
+            'cursor': events[-1].id if events else after,
+            'has_more': has_more
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@orders_bp.route('/export', methods=['GET'])
+@jwt_login_required
+@admission_controlled('export')
+def export_orders():
+    """Exporta os pedidos da empresa (uma linha por item e tamanho) em CSV ou XLSX via streaming"""
+    try:
+        
+        company_id = get_current_company_id()
+        if company_id is None:
+            return jsonify({'error': 'Empresa não selecionada'}), 400
+        
+        export_format = request.args.get('format', 'csv').lower()
+        if export_format not in ('csv', 'xlsx'):
+            return jsonify({'error': 'Formato inválido (use csv ou xlsx)'}), 400
+        
+        try:
+            stmt = _export_statement(company_id, request.args)
+        except ValueError:
+            return jsonify({'error': 'Filtros inválidos (datas em AAAA-MM-DD)'}), 400
+        
+        filename = f'pedidos_{company_id}_{datetime.utcnow():%Y%m%d}.{export_format}'
+        headers = {'Content-Disposition': f'attachment; filename="{filename}"'}
+        
+        if export_format == 'xlsx':
+            try:
+                import openpyxl  # noqa: F401
+            except ImportError:
+                return jsonify({'error': 'Exportação XLSX indisponível neste servidor'}), 400
+            return Response(
+                stream_with_context(_stream_xlsx(stmt)),
+                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                headers=headers
+            )
+        
+        return Response(
+            stream_with_context(_stream_csv(stmt)),
+            mimetype='text/csv',
+            headers=headers
+        )
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @orders_bp.route('/<int:order_id>', methods=['GET'])
 @jwt_login_required
 def get_order(order_id):
@@ -157,13 +450,11 @@ def get_order(order_id):
     try:
         user_id = get_jwt_identity()
         
-        # Obter company_id da associação UserCompany
-        user_company = UserCompany.query.filter_by(user_id=user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
-        company_id = user_company.company_id
         
-        order = Order.query.filter(
+        order = Order.query.options(*order_load_options()).filter(
             and_(
                 Order.id == order_id,
                 Order.user_id == user_id,
@@ -171,6 +462,16 @@ def get_order(order_id):
             )
         ).first()
         
+        if not order:
+            # Pedidos antigos podem ter sido movidos para o arquivo
+            order = ArchivedOrder.query.options(*order_load_options(ArchivedOrder)).filter(
+                and_(
+                    ArchivedOrder.id == order_id,
+                    ArchivedOrder.user_id == user_id,
+                    ArchivedOrder.company_id == company_id
+                )
+            ).first()
+        
         if not order:
             return jsonify({'error': 'Pedido não encontrado'}), 404
         
@@ -179,144 +480,170 @@ def get_order(order_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _sync_orders_batch(user_id, company_id, orders_data, report_progress=None):
+    """Cria os pedidos sincronizados numa única transação; pedidos inválidos são devolvidos em failed_orders.
+
+    Clientes e produtos do lote são resolvidos de uma vez (clientes novos via
+    INSERT ... ON CONFLICT, sem falhar quando outro sync cria o mesmo CNPJ) e
+    os pedidos são gravados num único flush.
+    """
+    created_orders = []
+    failed_orders = []
+    valid_orders = []
+    
+    for order_data in orders_data:
+        try:
+            required_fields = ['client_cnpj', 'client_razao_social', 'items']
+            valid = True
+            for field in required_fields:
+                if not order_data.get(field):
+                    valid = False
+                    break
+            
+            if not valid or not order_data['items'] or len(order_data['items']) == 0:
+                failed_orders.append({
+                    'order': order_data,
+                    'error': 'Dados inválidos'
+                })
+                continue
+            
+            has_valid_item = False
+            for item in order_data['items']:
+                if item.get('quantity'):
+                    for size, qty in item['quantity'].items():
+                        if qty > 0:
+                            has_valid_item = True
+                            break
+                if has_valid_item:
+                    break
+            
+            if not has_valid_item:
+                failed_orders.append({
+                    'order': order_data,
+                    'error': 'Nenhum item com quantidade válida'
+                })
+                continue
+            
+            valid_orders.append(order_data)
+            
+        except Exception as e:
+            failed_orders.append({
+                'order': order_data,
+                'error': str(e)
+            })
+    
+    clients = ensure_clients({
+        order_data['client_cnpj']: (order_data['client_razao_social'], order_data.get('client_nome_fantasia', ''))
+        for order_data in valid_orders
+    })
+    products = products_by_code(company_id, (
+        item_data.get('code') for order_data in valid_orders for item_data in order_data['items']
+    ))
+    
+    for index, order_data in enumerate(valid_orders):
+        try:
+            payment_method_id = None
+            if order_data.get('payment_method_id'):
+                payment_method = db.session.get(PaymentMethod, order_data['payment_method_id'])
+                if payment_method and payment_method.is_active:
+                    payment_method_id = payment_method.id
+            
+            # Todos os produtos conferidos antes de montar os itens: um pedido recusado
+            # no meio do caminho não deixa itens soltos ligados aos produtos da sessão
+            missing = next((item_data['code'] for item_data in order_data['items']
+                            if item_data.get('code') not in products), None)
+            if missing is not None:
+                raise Exception(f'Produto {missing} não encontrado')
+            
+            total_value = Decimal('0.00')
+            order_items = []
+            
+            for item_data in order_data['items']:
+                product = products[item_data['code']]
+                
+                item_total_qty = sum(item_data['quantity'].values())
+                if item_total_qty > 0:
+                    unit_value = Decimal(str(item_data.get('unit_value', product.value)))
+                    total_value += unit_value * item_total_qty
+                    
+                    # product_id em vez do relacionamento: o item só entra na sessão junto com o pedido
+                    order_items.append(OrderItem(
+                        product_id=product.id,
+                        quantity=item_data['quantity'],
+                        unit_value=unit_value
+                    ))
+            
+            discount_percentage = Decimal(str(order_data.get('discount_percentage', 0)))
+            if discount_percentage > 0:
+                discount_amount = total_value * (discount_percentage / 100)
+                total_value -= discount_amount
+            
+            order = Order(
+                user_id=user_id,
+                company_id=company_id,
+                client=clients[order_data['client_cnpj']],
+                payment_method_id=payment_method_id,
+                discount_percentage=discount_percentage,
+                total_value=total_value,
+                status='Concluído',
+                order_items=order_items
+            )
+            
+            db.session.add(order)
+            created_orders.append(order)
+            
+        except Exception as e:
+            failed_orders.append({
+                'order': order_data,
+                'error': str(e)
+            })
+    
+        if report_progress and (index + 1) % SYNC_PROGRESS_EVERY == 0:
+            report_progress((index + 1) / len(valid_orders))
+    
+    db.session.flush()
+    synced_orders = [order.id for order in created_orders]
+    # Eventos entram por último para que o id (cursor do feed) seja atribuído perto do commit
+    db.session.add_all([OrderEvent.for_order(order, 'order.created') for order in created_orders])
+    db.session.commit()
+    
+    return {
+        'message': f'{len(synced_orders)} pedidos sincronizados com sucesso',
+        'synced_count': len(synced_orders),
+        'failed_count': len(failed_orders),
+        'synced_orders': synced_orders,
+        'failed_orders': failed_orders
+    }
+
+@job_handler('orders.sync')
+def _sync_orders_job(payload, job):
+    return _sync_orders_batch(job.user_id, job.company_id, payload['orders'], job.report_progress)
+
 @orders_bp.route('/sync', methods=['POST'])
 @jwt_login_required
+@admission_controlled('sync')
 def sync_orders():
-    """Sincroniza pedidos offline (recebe uma lista de pedidos para criar)"""
+    """Sincroniza pedidos offline (recebe uma lista de pedidos para criar).
+
+    Com ?async=1 o lote é processado em segundo plano e a resposta é 202 com o id do job.
+    """
     try:
         user_id = get_jwt_identity()
         
-        # Obter company_id da associação UserCompany
-        user_company = UserCompany.query.filter_by(user_id=user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
-        company_id = user_company.company_id
         
         data = request.json
         
         if not data or not data.get('orders'):
             return jsonify({'error': 'Lista de pedidos é obrigatória'}), 400
         
-        synced_orders = []
-        failed_orders = []
+        if request.args.get('async', '').lower() in ('1', 'true'):
+            return enqueue_response('orders.sync', {'orders': data['orders']}, user_id=user_id, company_id=company_id)
         
-        for order_data in data['orders']:
-            try:
-                required_fields = ['client_cnpj', 'client_razao_social', 'items']
-                valid = True
-                for field in required_fields:
-                    if not order_data.get(field):
-                        valid = False
-                        break
-                
-                if not valid or not order_data['items'] or len(order_data['items']) == 0:
-                    failed_orders.append({
-                        'order': order_data,
-                        'error': 'Dados inválidos'
-                    })
-                    continue
-                
-                has_valid_item = False
-                for item in order_data['items']:
-                    if item.get('quantity'):
-                        for size, qty in item['quantity'].items():
-                            if qty > 0:
-                                has_valid_item = True
-                                break
-                    if has_valid_item:
-                        break
-                
-                if not has_valid_item:
-                    failed_orders.append({
-                        'order': order_data,
-                        'error': 'Nenhum item com quantidade válida'
-                    })
-                    continue
-                
-                client = Client.query.filter_by(cnpj=order_data['client_cnpj']).first()
-                if not client:
-                    client = Client(
-                        cnpj=order_data['client_cnpj'],
-                        razao_social=order_data['client_razao_social'],
-                        nome_fantasia=order_data.get('client_nome_fantasia', '')
-                    )
-                    db.session.add(client)
-                    db.session.flush()
-                
-                payment_method_id = None
-                if order_data.get('payment_method_id'):
-                    payment_method = PaymentMethod.query.get(order_data['payment_method_id'])
-                    if payment_method and payment_method.is_active:
-                        payment_method_id = payment_method.id
-                
-                total_value = Decimal('0.00')
-                order_items_data = []
-                
-                for item_data in order_data['items']:
-                    product = Product.query.filter_by(
-                        company_id=company_id,
-                        code=item_data['code']
-                    ).first()
-                    
-                    if not product:
-                        raise Exception(f'Produto {item_data["code"]} não encontrado')
-                    
-                    item_total_qty = sum(item_data['quantity'].values())
-                    if item_total_qty > 0:
-                        item_value = Decimal(str(item_data.get('unit_value', product.value))) * item_total_qty
-                        total_value += item_value
-                        
-                        order_items_data.append({
-                            'product': product,
-                            'quantity': item_data['quantity'],
-                            'unit_value': Decimal(str(item_data.get('unit_value', product.value)))
-                        })
-                
-                discount_percentage = Decimal(str(order_data.get('discount_percentage', 0)))
-                if discount_percentage > 0:
-                    discount_amount = total_value * (discount_percentage / 100)
-                    total_value -= discount_amount
-                
-                order = Order(
-                    user_id=user_id,
-                    company_id=company_id,
-                    client_id=client.id,
-                    payment_method_id=payment_method_id,
-                    discount_percentage=discount_percentage,
-                    total_value=total_value,
-                    status='Concluído'
-                )
-                
-                db.session.add(order)
-                db.session.flush()
-                
-                for item_data in order_items_data:
-                    order_item = OrderItem(
-                        order_id=order.id,
-                        product_id=item_data['product'].id,
-                        quantity=item_data['quantity'],
-                        unit_value=item_data['unit_value']
-                    )
-                    db.session.add(order_item)
-                
-                synced_orders.append(order.id)
-                
-            except Exception as e:
-                failed_orders.append({
-                    'order': order_data,
-                    'error': str(e)
-                })
-        
-        db.session.commit()
-        
-        return jsonify({
-            'message': f'{len(synced_orders)} pedidos sincronizados com sucesso',
-            'synced_count': len(synced_orders),
-            'failed_count': len(failed_orders),
-            'synced_orders': synced_orders,
-            'failed_orders': failed_orders
-        }), 200
+        return jsonify(_sync_orders_batch(user_id, company_id, data['orders'])), 200
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
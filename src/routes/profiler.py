@@ -0,0 +1,47 @@
+from functools import wraps
+from flask import Blueprint, Response, current_app, jsonify, request
+from src.services.profiler import TOKEN_HEADER, token_matches
+
+profiler_bp = Blueprint('profiler', __name__)
+
+def profiler_admin_required(f):
+    """Exige o cabeçalho X-Profiler-Token igual a PROFILER_TOKEN (sem token configurado, tudo fica desligado)"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not token_matches(current_app, request.headers.get(TOKEN_HEADER)):
+            return jsonify({'error': 'Acesso negado'}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+@profiler_bp.route('/', methods=['GET'])
+@profiler_admin_required
+def list_profiles():
+    """Perfis gravados, do mais recente para o mais antigo"""
+    return jsonify(current_app.extensions['profiler'].list()), 200
+
+@profiler_bp.route('/<profile_id>', methods=['GET'])
+@profiler_admin_required
+def get_profile(profile_id):
+    """Pilhas no formato "collapsed" (uma pilha por linha + contagem), pronto para flamegraph.pl/speedscope"""
+    folded = current_app.extensions['profiler'].folded(profile_id)
+    if folded is None:
+        return jsonify({'error': 'Perfil não encontrado'}), 404
+    return Response(folded, mimetype='text/plain')
+
+@profiler_bp.route('/settings', methods=['GET', 'PUT'])
+@profiler_admin_required
+def profiler_settings():
+    """Consulta ou altera a taxa de amostragem (vale para o worker que atender a requisição)"""
+    if request.method == 'PUT':
+        data = request.json or {}
+        try:
+            rate = float(data.get('sample_rate', current_app.config['PROFILER_SAMPLE_RATE']))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'sample_rate inválido'}), 400
+        if not 0 <= rate <= 1:
+            return jsonify({'error': 'sample_rate deve estar entre 0 e 1'}), 400
+        current_app.config['PROFILER_SAMPLE_RATE'] = rate
+    return jsonify({
+        'sample_rate': current_app.config['PROFILER_SAMPLE_RATE'],
+        'interval_ms': current_app.config['PROFILER_INTERVAL'] * 1000
+    }), 200
@@ -0,0 +1,68 @@
+from flask import Blueprint, Response, jsonify, request
+from src.routes.auth import jwt_login_required
+from src.routes.orders import parse_date
+from src.services.admission import admission_controlled
+from src.services.reports import size_grid
+from src.services.tenant import get_current_company_id
+from datetime import datetime
+import csv
+import io
+
+reports_bp = Blueprint('reports', __name__)
+
+def _size_grid_csv(grid):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM para o Excel reconhecer UTF-8
+    buffer.write('\ufeff')
+    # Unidades por tamanho (colunas com o nome do tamanho) e depois o valor por tamanho
+    writer.writerow([
+        'produto_codigo', 'produto_descricao', *grid['sizes'], 'total_unidades',
+        *(f'valor_{size}' for size in grid['sizes']), 'total_valor'
+    ])
+    for product in grid['products']:
+        cells = [product['sizes'].get(size, {}) for size in grid['sizes']]
+        writer.writerow([
+            product['code'],
+            product['description'],
+            *(cell.get('units', 0) for cell in cells),
+            product['total_units'],
+            *(f"{cell.get('value', 0):.2f}" for cell in cells),
+            f"{product['total_value']:.2f}"
+        ])
+    return buffer.getvalue()
+
+@reports_bp.route('/size-grid', methods=['GET'])
+@jwt_login_required
+@admission_controlled('report')
+def get_size_grid():
+    """Unidades e valor vendidos por produto e tamanho (?date_from, date_to, status, format=csv)"""
+    try:
+        company_id = get_current_company_id()
+        if not company_id:
+            return jsonify({'error': 'Empresa não selecionada'}), 400
+        
+        try:
+            date_from = parse_date(request.args.get('date_from'))
+            date_to = parse_date(request.args.get('date_to'))
+        except ValueError:
+            return jsonify({'error': 'Datas inválidas (use AAAA-MM-DD)'}), 400
+        
+        report_format = request.args.get('format', 'json').lower()
+        if report_format not in ('json', 'csv'):
+            return jsonify({'error': 'Formato inválido (use json ou csv)'}), 400
+        
+        grid = size_grid(company_id, date_from, date_to, request.args.get('status'))
+        
+        if report_format == 'csv':
+            filename = f'grade_tamanhos_{company_id}_{datetime.utcnow():%Y%m%d}.csv'
+            return Response(
+                _size_grid_csv(grid),
+                mimetype='text/csv',
+                headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+            )
+        
+        return jsonify(grid), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,7 +1,8 @@
 from flask import Blueprint, jsonify, request
 from src.models.models import User, db, UserCompany
 from src.routes.auth import jwt_login_required
-from flask_jwt_extended import get_jwt_identity
+from src.services.tenant import get_current_company_id
+from src.services.read_path import core_read_enabled, json_response, users_json
 
 user_bp = Blueprint('user', __name__)
 
@@ -10,11 +11,12 @@ user_bp = Blueprint('user', __name__)
 def get_users():
     """Lista todos os usuários associados à empresa do usuário autenticado"""
     try:
-        user_id = get_jwt_identity()
-        user_company = UserCompany.query.filter_by(user_id=user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
-        company_id = user_company.company_id
+        
+        if core_read_enabled():
+            return json_response(users_json(company_id)), 200
         
         users = User.query.join(UserCompany).filter(UserCompany.company_id == company_id).all()
         return jsonify([user.to_dict() for user in users]), 200
@@ -26,11 +28,9 @@ def get_users():
 def create_user():
     """Cria um novo usuário associado à empresa do usuário autenticado"""
     try:
-        user_id = get_jwt_identity()
-        user_company = UserCompany.query.filter_by(user_id=user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
-        company_id = user_company.company_id
         
         data = request.json
         if not data or not data.get('email') or not data.get('password'):
@@ -59,11 +59,9 @@ def create_user():
 def get_user(user_id):
     """Obtém detalhes de um usuário específico"""
     try:
-        current_user_id = get_jwt_identity()
-        user_company = UserCompany.query.filter_by(user_id=current_user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
-        company_id = user_company.company_id
         
         user = User.query.join(UserCompany).filter(
             User.id == user_id,
@@ -81,11 +79,9 @@ def get_user(user_id):
 def update_user(user_id):
     """Atualiza um usuário específico"""
     try:
-        current_user_id = get_jwt_identity()
-        user_company = UserCompany.query.filter_by(user_id=current_user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
-        company_id = user_company.company_id
         
         user = User.query.join(UserCompany).filter(
             User.id == user_id,
@@ -110,11 +106,9 @@ def update_user(user_id):
 def delete_user(user_id):
     """Deleta um usuário específico"""
     try:
-        current_user_id = get_jwt_identity()
-        user_company = UserCompany.query.filter_by(user_id=current_user_id).first()
-        if not user_company:
+        company_id = get_current_company_id()
+        if company_id is None:
             return jsonify({'error': 'Empresa não selecionada'}), 400
-        company_id = user_company.company_id
         
         user = User.query.join(UserCompany).filter(
             User.id == user_id,
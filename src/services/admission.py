@@ -0,0 +1,160 @@
+import math
+import threading
+from functools import wraps
+from time import perf_counter
+from flask import current_app, jsonify, make_response
+from src.models.models import db
+from src.services.metrics import registry
+from src.services.tenant import get_current_company_id
+
+# Limites por classe de rota: concorrência por empresa, fila de espera e tempo máximo na fila
+DEFAULT_ADMISSION_LIMITS = {
+    'sync': {'concurrency': 2, 'queue': 4, 'timeout': 30, 'retry_after': 5},
+    'dashboard': {'concurrency': 4, 'queue': 8, 'timeout': 5, 'retry_after': 2},
+    'export': {'concurrency': 1, 'queue': 2, 'timeout': 10, 'retry_after': 10},
+    'report': {'concurrency': 2, 'queue': 4, 'timeout': 10, 'retry_after': 5}
+}
+
+LIMIT_KEYS = ('concurrency', 'queue', 'timeout', 'retry_after')
+
+registry.describe('admission_rejected_total', 'counter', 'Requisições recusadas pelo controle de admissão')
+registry.describe('admission_queue_wait_seconds', 'histogram', 'Tempo de espera na fila de admissão')
+registry.describe('admission_in_flight', 'gauge', 'Requisições admitidas em execução por classe de rota')
+registry.describe('admission_queued', 'gauge', 'Requisições aguardando admissão por classe de rota')
+
+
+class AdmissionGate:
+    """Semáforo com fila limitada para um par (empresa, classe de rota)"""
+
+    def __init__(self, concurrency, queue):
+        self.concurrency = concurrency
+        self.queue = queue
+        self.active = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout):
+        """Retorna 'admitted', 'queue_full' ou 'timeout'"""
+        with self._condition:
+            if self.active < self.concurrency:
+                self.active += 1
+                return 'admitted'
+            if self.waiting >= self.queue:
+                return 'queue_full'
+            self.waiting += 1
+            try:
+                if not self._condition.wait_for(lambda: self.active < self.concurrency, timeout):
+                    return 'timeout'
+                self.active += 1
+                return 'admitted'
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+
+class AdmissionController:
+    """Gates por (company_id, classe de rota), criados sob demanda.
+
+    Os limites valem por processo: com N workers do gunicorn a concorrência
+    efetiva de uma empresa é N vezes o limite configurado.
+    """
+
+    def __init__(self):
+        self._gates = {}
+        self._lock = threading.Lock()
+
+    def gate(self, company_id, route_class, limits):
+        key = (company_id, route_class)
+        gate = self._gates.get(key)
+        if gate is None:
+            with self._lock:
+                gate = self._gates.setdefault(key, AdmissionGate(limits['concurrency'], limits['queue']))
+        # Limites alterados em tempo de execução valem para os gates já criados
+        gate.concurrency, gate.queue = limits['concurrency'], limits['queue']
+        return gate
+
+
+controller = AdmissionController()
+
+
+def parse_admission_limits(value):
+    """'concurrency=4,queue=8,timeout=5' -> {'concurrency': 4, 'queue': 8, 'timeout': 5.0}"""
+    limits = {}
+    for entry in filter(None, (part.strip() for part in (value or '').split(','))):
+        key, _, number = entry.partition('=')
+        key = key.strip()
+        if key not in LIMIT_KEYS:
+            raise ValueError(f'Limite de admissão inválido: {entry!r}')
+        limits[key] = int(number) if key in ('concurrency', 'queue') else float(number)
+        if limits[key] < 0:
+            raise ValueError(f'Limite de admissão inválido: {entry!r}')
+    return limits
+
+
+def _limits(route_class):
+    """Limites da classe: ADMISSION_LIMITS sobrepõe os padrões campo a campo, sem desligar as outras classes"""
+    if not current_app.config.get('ADMISSION_ENABLED', True):
+        return None
+    override = (current_app.config.get('ADMISSION_LIMITS') or {}).get(route_class)
+    defaults = DEFAULT_ADMISSION_LIMITS.get(route_class)
+    if defaults is None:
+        return override
+    return {**defaults, **(override or {})}
+
+
+def admission_controlled(route_class):
+    """Limita a concorrência da rota por empresa; fila cheia ou espera esgotada viram 503 com Retry-After.
+
+    Respostas em streaming mantêm a vaga até o fim da transmissão.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            limits = _limits(route_class)
+            company_id = get_current_company_id() if limits else None
+            if company_id is None:
+                return f(*args, **kwargs)
+
+            # A consulta da empresa abriu uma transação: a conexão volta ao pool antes de
+            # esperar na fila e a rota admitida pega outra, senão a fila empilha conexões
+            db.session.rollback()
+
+            labels = (('route_class', route_class),)
+            gate = controller.gate(company_id, route_class, limits)
+            registry.add_gauge('admission_queued', labels, 1)
+            started = perf_counter()
+            try:
+                outcome = gate.acquire(limits['timeout'])
+            finally:
+                registry.add_gauge('admission_queued', labels, -1)
+            registry.observe('admission_queue_wait_seconds', labels, perf_counter() - started)
+
+            if outcome != 'admitted':
+                registry.inc('admission_rejected_total', labels + (('reason', outcome),))
+                response = jsonify({'error': 'Servidor ocupado, tente novamente em instantes'})
+                response.status_code = 503
+                response.headers['Retry-After'] = str(math.ceil(limits['retry_after']))
+                return response
+
+            registry.add_gauge('admission_in_flight', labels, 1)
+
+            def release():
+                gate.release()
+                registry.add_gauge('admission_in_flight', labels, -1)
+
+            try:
+                response = make_response(f(*args, **kwargs))
+            except BaseException:
+                release()
+                raise
+            if response.is_streamed:
+                response.call_on_close(release)
+            else:
+                release()
+            return response
+        return decorated_function
+    return decorator
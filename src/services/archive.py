@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, literal, select
+from src.models.models import db, Order, OrderItem, ArchivedOrder, ArchivedOrderItem
+from src.services.jobs import job_handler
+from src.services.sharding import data_engines, shard_engine
+
+DEFAULT_HORIZON_DAYS = 365
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _copy_columns(source, target, archived_at=None):
+    """Colunas do SELECT que alimenta o INSERT no arquivo, na ordem das colunas de destino"""
+    columns = [c.name for c in target.columns if c.name != 'archived_at']
+    selected = [source.c[name] for name in columns]
+    if archived_at is not None:
+        columns.append('archived_at')
+        selected.append(literal(archived_at, type_=target.c.archived_at.type))
+    return columns, selected
+
+
+def archive_orders(before, batch_size=DEFAULT_BATCH_SIZE, company_id=None, report_progress=None):
+    """Move pedidos com order_date anterior a `before` (e seus itens) para as tabelas de arquivo.
+
+    Cada lote é copiado e apagado numa transação própria, então a operação pode
+    ser interrompida e retomada sem duplicar nem perder pedidos. Sem empresa,
+    percorre o banco principal e todos os shards.
+    """
+    orders = Order.__table__
+    pending = select(orders.c.id).where(orders.c.order_date < before)
+    if company_id is not None:
+        pending = pending.where(orders.c.company_id == company_id)
+
+    engines = [shard_engine(company_id)] if company_id is not None else data_engines()
+    total = 0
+    for engine in engines:
+        with engine.connect() as conn:
+            total += conn.execute(select(db.func.count()).select_from(pending.subquery())).scalar()
+
+    moved = {'orders': 0, 'items': 0}
+    for engine in engines:
+        _archive_batches(engine, pending, batch_size, moved, total, report_progress)
+
+    return {'orders': moved['orders'], 'items': moved['items'], 'before': before.isoformat()}
+
+
+def _archive_batches(engine, pending, batch_size, moved, total, report_progress):
+    orders, items = Order.__table__, OrderItem.__table__
+    archived_orders, archived_items = ArchivedOrder.__table__, ArchivedOrderItem.__table__
+    while True:
+        with engine.begin() as conn:
+            ids = conn.execute(pending.order_by(orders.c.id).limit(batch_size)).scalars().all()
+            if not ids:
+                break
+            now = datetime.utcnow()
+            order_columns, order_select = _copy_columns(orders, archived_orders, now)
+            item_columns, item_select = _copy_columns(items, archived_items)
+            conn.execute(insert(archived_orders).from_select(
+                order_columns, select(*order_select).where(orders.c.id.in_(ids))
+            ))
+            moved['items'] += conn.execute(insert(archived_items).from_select(
+                item_columns, select(*item_select).where(items.c.order_id.in_(ids))
+            )).rowcount
+            conn.execute(delete(items).where(items.c.order_id.in_(ids)))
+            conn.execute(delete(orders).where(orders.c.id.in_(ids)))
+        moved['orders'] += len(ids)
+        if report_progress and total:
+            report_progress(moved['orders'] / total)
+
+
+def archive_horizon(days=None):
+    """Data de corte: pedidos anteriores a ela vão para o arquivo (padrão: ARCHIVE_HORIZON_DAYS)"""
+    if days is None:
+        days = current_app.config.get('ARCHIVE_HORIZON_DAYS', DEFAULT_HORIZON_DAYS)
+    return datetime.utcnow() - timedelta(days=days)
+
+
+@job_handler('orders.archive')
+def _archive_orders_job(payload, job):
+    before = archive_horizon(payload.get('horizon_days'))
+    return archive_orders(
+        before,
+        batch_size=payload.get('batch_size', DEFAULT_BATCH_SIZE),
+        company_id=payload.get('company_id'),
+        report_progress=job.report_progress
+    )
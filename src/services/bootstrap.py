@@ -0,0 +1,104 @@
+import hashlib
+from sqlalchemy import func, select
+from src.models.models import db, Client, Company, Order, PaymentMethod, Product, User
+from src.services.read_path import CLIENT, PRODUCT
+
+# Versão do formato do pacote; muda quando o formato de alguma seção muda
+BOOTSTRAP_SCHEMA = 1
+RECENT_CLIENTS_LIMIT = 50
+
+
+def _version(*parts):
+    return hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+
+
+def _columns(schema, rows):
+    """Lista em colunas: as chaves vão uma vez só em vez de se repetirem em cada linha"""
+    return {'columns': list(schema.keys), 'rows': [schema.to_list(row) for row in rows]}
+
+
+# Cada seção devolve (versão, função que monta os dados). A versão sai de uma
+# consulta barata (linha única ou agregado); os dados só são montados quando o
+# cliente não tem aquela versão.
+
+def _user_section(user_id, company_id):
+    user = db.session.get(User, user_id)
+    return _version(user.id, user.updated_at), user.to_dict
+
+
+def _company_section(user_id, company_id):
+    company = db.session.get(Company, company_id)
+    return _version(company.id, company.updated_at), company.to_dict
+
+
+def _catalog_section(user_id, company_id):
+    products = Product.__table__
+    condition = products.c.company_id == company_id
+    state = db.session.execute(
+        select(func.count(), func.max(products.c.updated_at), func.max(products.c.id)).where(condition)
+    ).one()
+
+    def data():
+        return _columns(PRODUCT, db.session.execute(
+            select(*PRODUCT.columns).where(condition).order_by(products.c.code)
+        ))
+    return _version(*state), data
+
+
+def _payment_methods_section(user_id, company_id):
+    payment_methods = db.session.scalars(
+        select(PaymentMethod).where(PaymentMethod.is_active.is_(True)).order_by(PaymentMethod.id)
+    ).all()
+    version = _version(*((method.id, method.updated_at) for method in payment_methods))
+    return version, lambda: [method.to_dict() for method in payment_methods]
+
+
+def _recent_clients_section(user_id, company_id):
+    orders = Order.__table__
+    recent = (
+        select(orders.c.client_id, func.max(orders.c.order_date).label('last_order_date'))
+        .where(orders.c.user_id == user_id, orders.c.company_id == company_id)
+        .group_by(orders.c.client_id)
+        .order_by(func.max(orders.c.order_date).desc())
+        .limit(RECENT_CLIENTS_LIMIT)
+        .subquery()
+    )
+    clients = Client.__table__
+    rows = db.session.execute(
+        select(*CLIENT.columns, recent.c.last_order_date)
+        .join(recent, recent.c.client_id == clients.c.id)
+        .order_by(recent.c.last_order_date.desc(), clients.c.id)
+    ).all()
+    version = _version(*((row.id, row.updated_at, row.last_order_date) for row in rows))
+
+    def data():
+        last_order = len(CLIENT)
+        return {
+            'columns': [*CLIENT.keys, 'last_order_date'],
+            'rows': [
+                CLIENT.to_list(row[:last_order]) + [row[last_order].isoformat() if row[last_order] else None]
+                for row in rows
+            ]
+        }
+    return version, data
+
+
+SECTIONS = {
+    'user': _user_section,
+    'company': _company_section,
+    'catalog': _catalog_section,
+    'payment_methods': _payment_methods_section,
+    'recent_clients': _recent_clients_section
+}
+
+
+def build_bootstrap(user_id, company_id, known_versions):
+    """Pacote de inicialização do app: cada seção traz a versão e, se o cliente não a tem, os dados"""
+    sections = {}
+    for name, section in SECTIONS.items():
+        version, data = section(user_id, company_id)
+        entry = {'version': version}
+        if known_versions.get(name) != version:
+            entry['data'] = data()
+        sections[name] = entry
+    return {'schema': BOOTSTRAP_SCHEMA, 'company_id': company_id, 'sections': sections}
@@ -0,0 +1,68 @@
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli é opcional
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/css',
+    'text/csv',
+    'text/html',
+    'text/javascript',
+    'text/plain',
+    'image/svg+xml'
+}
+
+
+def choose_encoding(accept_encodings):
+    """Escolhe a melhor codificação aceita pelo cliente entre br e gzip"""
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding, app_config):
+    if encoding == 'br':
+        return brotli.compress(data, quality=app_config['COMPRESS_BR_QUALITY'])
+    return gzip.compress(data, compresslevel=app_config['COMPRESS_GZIP_LEVEL'], mtime=0)
+
+
+def init_compression(app):
+    """Comprime respostas grandes conforme o Accept-Encoding da requisição"""
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BR_QUALITY', 4)
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code >= 300
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        response.set_data(compress(data, encoding, app.config))
+        response.headers['Content-Encoding'] = encoding
+        if response.get_etag()[0]:
+            # ETag forte deixa de valer para o corpo comprimido
+            response.set_etag(response.get_etag()[0], weak=True)
+        return response
@@ -0,0 +1,79 @@
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def _int_env(name, default):
+    return int(os.getenv(name, default))
+
+
+def engine_options(uri):
+    """Retorna as opções de engine adequadas ao banco indicado pela URI"""
+    backend = make_url(uri).get_backend_name()
+
+    if backend == 'postgresql':
+        statement_timeout = _int_env('DB_STATEMENT_TIMEOUT_MS', 30000)
+        return {
+            'pool_size': _int_env('DB_POOL_SIZE', 10),
+            'max_overflow': _int_env('DB_MAX_OVERFLOW', 20),
+            'pool_timeout': _int_env('DB_POOL_TIMEOUT', 30),
+            'pool_recycle': _int_env('DB_POOL_RECYCLE', 1800),
+            'pool_pre_ping': True,
+            'connect_args': {'options': f'-c statement_timeout={statement_timeout}'}
+        }
+
+    if backend == 'sqlite':
+        # O busy_timeout é aplicado via PRAGMA; o timeout do driver fica alinhado
+        return {
+            'connect_args': {
+                'timeout': _int_env('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000,
+                'check_same_thread': False
+            }
+        }
+
+    return {}
+
+
+def bind_config(uri):
+    """Monta a configuração de um bind extra (SQLALCHEMY_BINDS) com o perfil da URI"""
+    return {'url': uri, **engine_options(uri)}
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Aplica os PRAGMAs de desempenho em cada nova conexão SQLite"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('PRAGMA database_list')
+        is_memory = all(not row[2] for row in cursor.fetchall())
+        if not is_memory:
+            # WAL permite leitores concorrentes enquanto há uma escrita em andamento
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute(f"PRAGMA mmap_size={_int_env('SQLITE_MMAP_SIZE', 268435456)}")
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f"PRAGMA busy_timeout={_int_env('SQLITE_BUSY_TIMEOUT_MS', 5000)}")
+        # Valor negativo = tamanho em KiB
+        cursor.execute(f"PRAGMA cache_size={-_int_env('SQLITE_CACHE_SIZE_KB', 65536)}")
+        cursor.execute('PRAGMA temp_store=MEMORY')
+    finally:
+        cursor.close()
+
+
+def apply_engine_profile(engine):
+    """Registra os ajustes por conexão do perfil do engine"""
+    if engine.dialect.name == 'sqlite':
+        if not event.contains(engine, 'connect', _set_sqlite_pragmas):
+            event.listen(engine, 'connect', _set_sqlite_pragmas)
+    return engine
+
+
+def init_database(app, db):
+    """Inicializa o SQLAlchemy aplicando o perfil de engine selecionado pela URI"""
+    app.config.setdefault(
+        'SQLALCHEMY_ENGINE_OPTIONS',
+        engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    )
+    db.init_app(app)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            apply_engine_profile(engine)
@@ -0,0 +1,141 @@
+import time
+from contextvars import ContextVar
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.util import find_tables
+
+REPLICA_BIND = 'replica'
+
+# Tabelas com dados por empresa: lidas e gravadas no shard da empresa (src/services/sharding.py)
+SHARDED_TABLES = frozenset({
+    'clients', 'products', 'orders', 'order_items', 'archived_orders', 'archived_order_items', 'order_events'
+})
+
+# (company_id, bind) fixado por sharding.tenant_scope fora de requisições (jobs, scripts)
+shard_scope = ContextVar('shard_scope', default=None)
+
+# user_id -> instante (monotonic) até o qual as leituras desse usuário ficam no primário
+_recent_writers = {}
+
+
+def _current_identity():
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        return None
+
+
+def mark_recent_write(user_id):
+    """Mantém as leituras do usuário no primário durante a janela de read-your-writes"""
+    window = current_app.config.get('REPLICA_STICKY_SECONDS', 5)
+    now = time.monotonic()
+    if len(_recent_writers) > 10000:
+        for key, until in list(_recent_writers.items()):
+            if until <= now:
+                _recent_writers.pop(key, None)
+    _recent_writers[str(user_id)] = now + window
+
+
+def _wrote_recently(user_id):
+    until = _recent_writers.get(str(user_id))
+    return until is not None and until > time.monotonic()
+
+
+def reads_from_replica():
+    """Indica se a requisição atual deve ler da réplica (decisão memorizada em g)"""
+    if not has_request_context():
+        return False
+
+    route = g.get('_db_route')
+    if route is None:
+        route = 'primary'
+        if (
+            request.method in ('GET', 'HEAD')
+            and request.blueprint in current_app.config.get('REPLICA_READ_BLUEPRINTS', ())
+            and not g.get('_db_wrote')
+        ):
+            user_id = _current_identity()
+            if user_id is None or not _wrote_recently(user_id):
+                route = REPLICA_BIND
+        g._db_route = route
+
+    return route == REPLICA_BIND
+
+
+def touches_sharded_tables(mapper=None, clause=None):
+    if mapper is not None and mapper.local_table.name in SHARDED_TABLES:
+        return True
+    if clause is not None:
+        return any(table.name in SHARDED_TABLES for table in find_tables(clause, include_crud=True))
+    return False
+
+
+def current_shard_bind(session):
+    """Bind do shard da empresa em contexto (None = banco principal).
+
+    Na requisição o tenant é resolvido uma vez (tenant.get_current_company_id);
+    se nenhuma rota o resolveu antes, a primeira consulta a uma tabela por empresa resolve.
+    """
+    scoped = shard_scope.get()
+    if scoped is not None:
+        return scoped[1]
+    if not has_request_context():
+        return None
+    if '_shard_bind' not in g:
+        from src.services.tenant import get_current_company_id
+        with session.no_autoflush:
+            try:
+                get_current_company_id()
+            except RuntimeError:
+                # Requisição sem JWT: sem tenant, banco principal
+                g._shard_bind = None
+    return g._shard_bind
+
+
+class RoutingSession(Session):
+    """Sessão que envia tabelas por empresa ao shard do tenant, leituras de handlers GET
+    para a réplica e o resto para o primário"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and current_app.config.get('SHARD_BINDS'):
+            if mapper is not None:
+                mapper = inspect(mapper)
+            if touches_sharded_tables(mapper, clause):
+                shard = current_shard_bind(self)
+                if shard is not None:
+                    return self._db.engines[shard]
+
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or self._flushing or isinstance(clause, UpdateBase):
+            return engine
+
+        engines = self._db.engines
+        if REPLICA_BIND in engines and engine is engines.get(None) and reads_from_replica():
+            return engines[REPLICA_BIND]
+        return engine
+
+
+def _note_write():
+    if not has_request_context():
+        return
+    # Qualquer leitura posterior nesta requisição vai para o primário
+    g._db_wrote = True
+    g._db_route = 'primary'
+    user_id = _current_identity()
+    if user_id is not None:
+        mark_recent_write(user_id)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _track_write(session, flush_context):
+    _note_write()
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _track_dml(orm_execute_state):
+    # INSERT/UPDATE/DELETE executados direto na sessão (ex.: ON CONFLICT em upserts.py) não passam pelo flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _note_write()
@@ -0,0 +1,143 @@
+import json
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('src.sql')
+
+_current_stats = ContextVar('sql_request_stats', default=None)
+
+
+class SQLStats:
+    """Contadores de SQL de uma requisição (ou de um bloco capture_queries)"""
+
+    __slots__ = ('query_count', 'db_time', 'statements')
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        # statement -> [execuções, tempo total]
+        self.statements = {}
+
+    def record(self, statement, elapsed):
+        self.query_count += 1
+        self.db_time += elapsed
+        entry = self.statements.get(statement)
+        if entry is None:
+            self.statements[statement] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def repeated(self, threshold):
+        """Statements idênticos executados pelo menos `threshold` vezes (provável N+1)"""
+        return [
+            {'statement': statement, 'count': count, 'total_ms': round(total * 1000, 2)}
+            for statement, (count, total) in self.statements.items()
+            if count >= threshold
+        ]
+
+    def worst(self, limit=5):
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {'statement': statement, 'count': count, 'total_ms': round(total * 1000, 2)}
+            for statement, (count, total) in ranked[:limit]
+        ]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None and context is not None:
+        context._sql_started = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None and context is not None:
+        started = getattr(context, '_sql_started', None)
+        if started is not None:
+            stats.record(statement, perf_counter() - started)
+
+
+def install_engine_listeners():
+    """Registra os hooks de cursor em todos os engines (idempotente)"""
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+@contextmanager
+def capture_queries():
+    """Coleta as queries executadas dentro do bloco"""
+    install_engine_listeners()
+    stats = SQLStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def init_sql_instrumentation(app):
+    """Contagem de queries por requisição, detecção de N+1, Server-Timing e log de lentidão"""
+    app.config.setdefault('SQL_INSTRUMENTATION_SAMPLE_RATE', 0.1)
+    app.config.setdefault('SLOW_REQUEST_MS', 500)
+    app.config.setdefault('SQL_N_PLUS_ONE_THRESHOLD', 5)
+
+    if app.config['SQL_INSTRUMENTATION_SAMPLE_RATE'] <= 0:
+        return
+
+    install_engine_listeners()
+
+    @app.before_request
+    def start_sql_instrumentation():
+        if random.random() < app.config['SQL_INSTRUMENTATION_SAMPLE_RATE']:
+            g._sql_started = perf_counter()
+            g._sql_token = _current_stats.set(SQLStats())
+
+    @app.after_request
+    def report_sql_instrumentation(response):
+        stats = _current_stats.get()
+        if stats is None or '_sql_started' not in g:
+            return response
+
+        duration_ms = (perf_counter() - g._sql_started) * 1000
+        db_ms = stats.db_time * 1000
+        suspects = stats.repeated(app.config['SQL_N_PLUS_ONE_THRESHOLD'])
+
+        timings = [
+            f'db;dur={db_ms:.1f};desc="{stats.query_count} queries"',
+            f'app;dur={duration_ms:.1f}'
+        ]
+        if suspects:
+            timings.append(f'n1;desc="{len(suspects)} repeated statements"')
+        response.headers.add('Server-Timing', ', '.join(timings))
+
+        if suspects or duration_ms >= app.config['SLOW_REQUEST_MS']:
+            log = logger.warning if suspects else logger.info
+            log(json.dumps({
+                'event': 'slow_request' if duration_ms >= app.config['SLOW_REQUEST_MS'] else 'n_plus_one',
+                'endpoint': request.endpoint,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round(duration_ms, 2),
+                'query_count': stats.query_count,
+                'db_ms': round(db_ms, 2),
+                'worst_statements': stats.worst(),
+                'n_plus_one': suspects
+            }, ensure_ascii=False))
+        return response
+
+    @app.teardown_request
+    def stop_sql_instrumentation(exc):
+        token = g.pop('_sql_token', None)
+        if token is not None:
+            try:
+                _current_stats.reset(token)
+            except ValueError:
+                _current_stats.set(None)
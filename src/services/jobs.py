@@ -0,0 +1,283 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from uuid import uuid4
+from flask import jsonify, url_for
+from sqlalchemy import delete, update
+from sqlalchemy.exc import OperationalError
+from src.models.models import Job
+from src.services.sharding import tenant_scope
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+FINISHED = (SUCCEEDED, FAILED)
+
+_handlers = {}
+
+
+def job_handler(kind):
+    """Registra a função que executa jobs do tipo `kind`.
+
+    A função recebe (payload, job) e devolve um resultado serializável em JSON;
+    `job.report_progress(fração)` atualiza o progresso e o heartbeat.
+    """
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+class JobContext:
+    """Visão do job entregue ao handler durante a execução"""
+
+    def __init__(self, runner, job_id, user_id, company_id):
+        self._runner = runner
+        self.id = job_id
+        self.user_id = user_id
+        self.company_id = company_id
+        self._progress = None
+
+    def report_progress(self, fraction):
+        """Registra o progresso; fora do SQLite grava na hora, junto com o heartbeat"""
+        self._progress = max(0.0, min(float(fraction), 1.0))
+        # No SQLite o handler pode estar segurando o único lock de escrita: o progresso vai no próximo heartbeat
+        if self._runner._db.engine.dialect.name != 'sqlite':
+            self.heartbeat()
+
+    def heartbeat(self):
+        """Grava heartbeat (e o último progresso) numa conexão própria; falhas aqui não interrompem o job"""
+        values = {'heartbeat_at': datetime.utcnow()}
+        if self._progress is not None:
+            values['progress'] = self._progress
+        try:
+            self._runner._update(self.id, **values)
+        except OperationalError as e:
+            logger.warning('heartbeat do job %s não gravado: %s', self.id, e)
+
+
+class JobRunner:
+    """Executor de jobs em processo, persistidos na tabela `jobs`.
+
+    O runner começa a executar jobs na primeira requisição atendida pelo
+    processo (ou ao subir o servidor com `python src/main.py`); importar a
+    aplicação não basta. O enfileiramento grava a linha e, com o runner
+    ativo, a submete ao pool local; a execução só começa depois de um UPDATE
+    condicional (queued -> running), então a mesma linha nunca roda duas
+    vezes mesmo quando vários workers a recuperam.
+    Enquanto o handler roda, uma thread grava o heartbeat a cada
+    JOBS_HEARTBEAT_SECONDS. Na inicialização e periodicamente os jobs órfãos
+    (enfileirados sem dono ou em execução sem heartbeat recente e fora do pool
+    deste processo) voltam para a fila e os finalizados além do prazo de
+    retenção são apagados.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._db = None
+        self._executor = None
+        self._executor_pid = None
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def init_app(self, app, db):
+        app.config.setdefault('JOBS_EXECUTOR', 'thread')
+        app.config.setdefault('JOBS_WORKERS', 2)
+        app.config.setdefault('JOBS_RETENTION_HOURS', 72)
+        app.config.setdefault('JOBS_STALE_SECONDS', 900)
+        app.config.setdefault('JOBS_HEARTBEAT_SECONDS', 60)
+        app.config.setdefault('JOBS_SWEEP_SECONDS', 60)
+        self.app = app
+        self._db = db
+        app.extensions['jobs'] = self
+        # Só o processo que atende requisições executa jobs; scripts que apenas importam a app não
+        app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        if not self._started:
+            self.start()
+
+    def start(self):
+        """Recupera jobs pendentes e inicia a varredura periódica (não roda nos processos do pool)"""
+        if multiprocessing.parent_process() is not None:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.sweep()
+        interval = self.app.config['JOBS_SWEEP_SECONDS']
+        if interval:
+            thread = threading.Thread(target=self._sweep_loop, args=(interval,), name='jobs-sweeper', daemon=True)
+            thread.start()
+
+    # Enfileiramento
+
+    def enqueue(self, kind, payload=None, user_id=None, company_id=None):
+        """Grava o job e, se este processo executa jobs, o submete ao pool; retorna o id.
+
+        Fora do servidor (scripts de linha de comando) o job fica na fila e é
+        executado pelo servidor na próxima varredura.
+        """
+        if kind not in _handlers:
+            raise ValueError(f'Tipo de job desconhecido: {kind}')
+        job_id = uuid4().hex
+        job = Job(id=job_id, kind=kind, status=QUEUED, payload=payload, user_id=user_id, company_id=company_id)
+        session = self._db.session
+        session.add(job)
+        session.commit()
+        if self._started:
+            self._submit(job_id)
+        return job_id
+
+    def _get_executor(self):
+        # Após um fork o pool herdado não tem threads/processos vivos
+        if self._executor is None or self._executor_pid != os.getpid():
+            workers = self.app.config['JOBS_WORKERS']
+            if self.app.config['JOBS_EXECUTOR'] == 'process':
+                self._executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+            else:
+                self._executor = ThreadPoolExecutor(workers, thread_name_prefix='job')
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _submit(self, job_id):
+        with self._lock:
+            if job_id in self._pending:
+                return
+            self._pending.add(job_id)
+        if self.app.config['JOBS_EXECUTOR'] == 'process':
+            future = self._get_executor().submit(_run_in_process, job_id)
+        else:
+            future = self._get_executor().submit(self.execute, job_id)
+        future.add_done_callback(lambda done: self._finished(job_id, done))
+
+    def _finished(self, job_id, future):
+        with self._lock:
+            self._pending.discard(job_id)
+        # Erros dos handlers já são gravados no job; aqui sobram falhas do próprio pool
+        if not future.cancelled() and future.exception() is not None:
+            logger.error('job %s não executado: %s', job_id, future.exception())
+
+    # Execução
+
+    def _update(self, job_id, **values):
+        with self.app.app_context(), self._db.engine.begin() as conn:
+            return conn.execute(update(Job.__table__).where(Job.__table__.c.id == job_id).values(**values))
+
+    def _claim(self, job_id):
+        table = Job.__table__
+        now = datetime.utcnow()
+        with self.app.app_context(), self._db.engine.begin() as conn:
+            result = conn.execute(
+                update(table)
+                .where(table.c.id == job_id, table.c.status == QUEUED)
+                .values(status=RUNNING, started_at=now, heartbeat_at=now, attempts=table.c.attempts + 1)
+            )
+            return result.rowcount == 1
+
+    def execute(self, job_id):
+        """Executa o job se ainda estiver na fila; usado pelas threads e pelos processos do pool"""
+        if not self._claim(job_id):
+            return
+        with self.app.app_context():
+            session = self._db.session
+            try:
+                job = session.get(Job, job_id)
+                handler = _handlers.get(job.kind)
+                if handler is None:
+                    raise ValueError(f'Tipo de job desconhecido: {job.kind}')
+                context = JobContext(self, job.id, job.user_id, job.company_id)
+                payload = job.payload
+                session.commit()
+                # Dados da empresa do job ficam no shard dela
+                with tenant_scope(context.company_id), self._heartbeats(context):
+                    result = handler(payload, context)
+                    session.commit()
+                self._update(job_id, status=SUCCEEDED, progress=1.0, result=result, finished_at=datetime.utcnow())
+            except Exception as e:
+                session.rollback()
+                logger.error('job %s falhou: %s\n%s', job_id, e, traceback.format_exc())
+                self._update(job_id, status=FAILED, error=str(e), finished_at=datetime.utcnow())
+            finally:
+                session.remove()
+
+    @contextmanager
+    def _heartbeats(self, context):
+        """Mantém o heartbeat do job em dia enquanto o handler roda, mesmo sem report_progress"""
+        stop = threading.Event()
+        interval = self.app.config['JOBS_HEARTBEAT_SECONDS']
+
+        def beat():
+            while not stop.wait(interval):
+                context.heartbeat()
+
+        thread = threading.Thread(target=beat, name=f'job-heartbeat-{context.id}', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    # Recuperação e retenção
+
+    def _sweep_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning('varredura de jobs falhou: %s', e)
+
+    def sweep(self):
+        """Devolve à fila jobs órfãos, ressubmete os enfileirados e apaga os expirados"""
+        table = Job.__table__
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=self.app.config['JOBS_STALE_SECONDS'])
+        expired_before = now - timedelta(hours=self.app.config['JOBS_RETENTION_HOURS'])
+        # Jobs ainda no pool deste processo seguem vivos mesmo com o heartbeat atrasado
+        with self._lock:
+            running_here = list(self._pending)
+        with self.app.app_context(), self._db.engine.begin() as conn:
+            conn.execute(
+                update(table)
+                .where(table.c.status == RUNNING, table.c.heartbeat_at < stale_before, table.c.id.not_in(running_here))
+                .values(status=QUEUED)
+            )
+            conn.execute(delete(table).where(table.c.status.in_(FINISHED), table.c.finished_at < expired_before))
+            queued = conn.execute(
+                table.select().with_only_columns(table.c.id)
+                .where(table.c.status == QUEUED).order_by(table.c.created_at)
+            ).scalars().all()
+        for job_id in queued:
+            self._submit(job_id)
+        return len(queued)
+
+
+def _run_in_process(job_id):
+    # Executado nos processos do pool (spawn): importar a aplicação registra os handlers
+    from src.main import app
+    app.extensions['jobs'].execute(job_id)
+
+
+runner = JobRunner()
+
+
+def enqueue_response(kind, payload=None, user_id=None, company_id=None):
+    """Enfileira o job e devolve a resposta 202 padrão com o id e a URL de status"""
+    job_id = runner.enqueue(kind, payload, user_id=user_id, company_id=company_id)
+    status_url = url_for('jobs.get_job', job_id=job_id)
+    response = jsonify({'job_id': job_id, 'status': QUEUED, 'status_url': status_url})
+    response.headers['Location'] = status_url
+    return response, 202
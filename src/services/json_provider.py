@@ -0,0 +1,56 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+
+def _default(o):
+    """Converte os tipos vindos do banco para os mesmos valores usados em to_dict()"""
+    if isinstance(o, Decimal):
+        return float(o)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if hasattr(o, '__json__'):
+        return o.__json__()
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Provider JSON baseado em orjson, com fallback para a biblioteca padrão.
+
+    Decimal e datetime são serializados nativamente (float e ISO 8601), então
+    as rotas podem devolver os valores do banco sem conversão campo a campo.
+    """
+
+    sort_keys = False
+    ensure_ascii = False
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, indent=kwargs.get('indent')).decode('utf-8')
+
+    def dumps_bytes(self, obj, indent=None):
+        """Serializa direto para bytes, sem passar por str"""
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_default, option=option)
+        separators = None if indent else (',', ':')
+        return json.dumps(
+            obj, default=_default, ensure_ascii=False, indent=indent, separators=separators
+        ).encode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent), mimetype=self.mimetype)
@@ -0,0 +1,259 @@
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from time import perf_counter
+from flask import g, request
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Arquivos de workers sem atualização há mais tempo que isso têm os gauges descartados
+STALE_GAUGE_SECONDS = 60
+
+
+class MetricsRegistry:
+    """Registro de métricas em memória, exportado no formato texto do Prometheus.
+
+    Com METRICS_DIR configurado cada worker grava periodicamente um snapshot em
+    `metrics-<pid>.json` e o /metrics agrega os snapshots de todos os workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._collectors = []
+        self._directory = None
+        self._flusher_pid = None
+
+    def describe(self, name, kind, help_text, buckets=None):
+        self._meta[name] = (kind, help_text, tuple(buckets or DEFAULT_BUCKETS))
+
+    def add_collector(self, collector):
+        """Função chamada antes de cada snapshot para atualizar gauges calculados"""
+        self._collectors.append(collector)
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name, labels, value):
+        with self._lock:
+            self._gauges[(name, labels)] = value
+
+    def add_gauge(self, name, labels, delta):
+        key = (name, labels)
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0) + delta
+
+    def observe(self, name, labels, value):
+        buckets = self._meta[name][2]
+        index = bisect_left(buckets, value)
+        key = (name, labels)
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self):
+        for collector in self._collectors:
+            collector(self)
+        with self._lock:
+            return {
+                'counters': [[n, list(map(list, l)), v] for (n, l), v in self._counters.items()],
+                'gauges': [[n, list(map(list, l)), v] for (n, l), v in self._gauges.items()],
+                'histograms': [
+                    [n, list(map(list, l)), list(e[0]), e[1], e[2]]
+                    for (n, l), e in self._histograms.items()
+                ]
+            }
+
+    # Agregação entre workers
+
+    def configure_directory(self, directory, interval):
+        self._directory = directory
+        self._interval = interval
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def ensure_flusher(self):
+        """Inicia (uma vez por processo) a thread que grava o snapshot do worker"""
+        if not self._directory or self._flusher_pid == os.getpid():
+            return
+        self._flusher_pid = os.getpid()
+        thread = threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True)
+        thread.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self._interval)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def flush(self):
+        path = os.path.join(self._directory, f'metrics-{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def _snapshots(self):
+        snapshots = [(self.snapshot(), True)]
+        if not self._directory:
+            return snapshots
+        own = os.path.join(self._directory, f'metrics-{os.getpid()}.json')
+        now = time.time()
+        for path in glob.glob(os.path.join(self._directory, 'metrics-*.json')):
+            if path == own:
+                continue
+            try:
+                fresh = now - os.path.getmtime(path) < STALE_GAUGE_SECONDS
+                with open(path) as f:
+                    snapshots.append((json.load(f), fresh))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self):
+        counters, gauges, histograms = {}, {}, {}
+        for snapshot, fresh in self._snapshots():
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            if fresh:
+                for name, labels, value in snapshot['gauges']:
+                    key = (name, tuple(map(tuple, labels)))
+                    gauges[key] = gauges.get(key, 0) + value
+            for name, labels, bucket_counts, total, count in snapshot['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                entry = histograms.get(key)
+                if entry is None:
+                    histograms[key] = [list(bucket_counts), total, count]
+                else:
+                    entry[0] = [a + b for a, b in zip(entry[0], bucket_counts)]
+                    entry[1] += total
+                    entry[2] += count
+
+        lines = []
+        for name, (kind, help_text, buckets) in sorted(self._meta.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'counter':
+                for (n, labels), value in sorted(counters.items()):
+                    if n == name:
+                        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+            elif kind == 'gauge':
+                for (n, labels), value in sorted(gauges.items()):
+                    if n == name:
+                        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+            else:
+                for (n, labels), (bucket_counts, total, count) in sorted(histograms.items()):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, bucket_count in zip(buckets, bucket_counts):
+                        cumulative += bucket_count
+                        bucket_labels = labels + (('le', _format_value(bound)),)
+                        lines.append(f'{name}_bucket{_format_labels(bucket_labels)} {cumulative}')
+                    bucket_labels = labels + (('le', '+Inf'),)
+                    lines.append(f'{name}_bucket{_format_labels(bucket_labels)} {count}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+registry = MetricsRegistry()
+
+registry.describe('http_requests_total', 'counter', 'Total de requisições HTTP por rota e status')
+registry.describe('http_request_duration_seconds', 'histogram', 'Latência das requisições HTTP por rota')
+registry.describe('http_requests_in_progress', 'gauge', 'Requisições em andamento por blueprint')
+registry.describe('db_pool_size', 'gauge', 'Tamanho configurado do pool de conexões')
+registry.describe('db_pool_checked_out', 'gauge', 'Conexões do pool em uso')
+registry.describe('db_pool_overflow', 'gauge', 'Conexões abertas além do tamanho do pool')
+registry.describe('outbound_request_duration_seconds', 'histogram', 'Latência de chamadas a serviços externos')
+
+
+def observe_outbound(service, outcome, seconds):
+    """Registra a duração de uma chamada a um serviço externo (ex.: consulta de CNPJ)"""
+    registry.observe('outbound_request_duration_seconds', (('service', service), ('outcome', outcome)), seconds)
+
+
+def _pool_collector(db, app):
+    def collect(reg):
+        with app.app_context():
+            engines = dict(db.engines)
+        for bind_key, engine in engines.items():
+            pool = engine.pool
+            labels = (('bind', bind_key or 'default'),)
+            for metric, attr in (
+                ('db_pool_size', 'size'),
+                ('db_pool_checked_out', 'checkedout'),
+                ('db_pool_overflow', 'overflow')
+            ):
+                method = getattr(pool, attr, None)
+                if method is not None:
+                    reg.set_gauge(metric, labels, max(method(), 0))
+    return collect
+
+
+def init_metrics(app, db):
+    """Registra os hooks de latência/contagem por rota e o coletor de pool"""
+    registry.configure_directory(app.config.get('METRICS_DIR'), app.config.get('METRICS_FLUSH_INTERVAL', 5))
+    registry.add_collector(_pool_collector(db, app))
+
+    @app.before_request
+    def start_request_metrics():
+        registry.ensure_flusher()
+        g._metrics_started = perf_counter()
+        g._metrics_blueprint = request.blueprint or 'app'
+        registry.add_gauge('http_requests_in_progress', (('blueprint', g._metrics_blueprint),), 1)
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('_metrics_started')
+        if started is not None:
+            endpoint = request.endpoint or 'unmatched'
+            blueprint = g._metrics_blueprint
+            registry.observe(
+                'http_request_duration_seconds',
+                (('blueprint', blueprint), ('endpoint', endpoint)),
+                perf_counter() - started
+            )
+            registry.inc(
+                'http_requests_total',
+                (('blueprint', blueprint), ('endpoint', endpoint),
+                 ('method', request.method), ('status', str(response.status_code)))
+            )
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        blueprint = g.pop('_metrics_blueprint', None)
+        if blueprint is not None:
+            registry.add_gauge('http_requests_in_progress', (('blueprint', blueprint),), -1)
@@ -0,0 +1,175 @@
+import hmac
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+from collections import Counter
+from datetime import datetime
+from time import perf_counter
+from uuid import uuid4
+from flask import g, request
+
+PROFILE_HEADER = 'X-Profile'
+TOKEN_HEADER = 'X-Profiler-Token'
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class SamplingProfiler:
+    """Amostra a pilha de uma thread a cada `interval` segundos a partir de uma thread auxiliar.
+
+    Nada é instrumentado na thread perfilada: o custo fica na thread de
+    amostragem e só existe enquanto o perfil está ativo.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if filename.startswith(_ROOT):
+                filename = os.path.relpath(filename, _ROOT)
+            else:
+                filename = os.path.basename(filename)
+            label = self._labels[code] = f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+        return label
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+
+class ProfileStore:
+    """Perfis gravados em disco (compartilhados entre os workers da mesma máquina)"""
+
+    def __init__(self, directory, keep):
+        self.directory = directory
+        self.keep = keep
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, meta, stacks):
+        base = os.path.join(self.directory, meta['id'])
+        with open(f'{base}.folded', 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f'{stack} {count}\n')
+        with open(f'{base}.json', 'w') as f:
+            json.dump(meta, f)
+        self._prune()
+
+    def _prune(self):
+        metas = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith('.json')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in metas[:-self.keep] if len(metas) > self.keep else ():
+            profile_id = entry.name[:-len('.json')]
+            for suffix in ('.json', '.folded'):
+                try:
+                    os.remove(os.path.join(self.directory, profile_id + suffix))
+                except OSError:
+                    pass
+
+    def list(self):
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                try:
+                    with open(entry.path) as f:
+                        profiles.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return sorted(profiles, key=lambda meta: meta['created_at'], reverse=True)
+
+    def folded(self, profile_id):
+        if not profile_id.isalnum():
+            return None
+        try:
+            with open(os.path.join(self.directory, f'{profile_id}.folded')) as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+def token_matches(app, value):
+    token = app.config.get('PROFILER_TOKEN')
+    return bool(token) and hmac.compare_digest(value or '', token)
+
+
+def init_profiler(app):
+    """Perfila requisições marcadas com X-Profile: <PROFILER_TOKEN> ou sorteadas por PROFILER_SAMPLE_RATE.
+
+    Desligado (taxa 0 e sem o cabeçalho) o custo por requisição é uma leitura de config e de header.
+    """
+    app.config.setdefault('PROFILER_SAMPLE_RATE', 0.0)
+    app.config.setdefault('PROFILER_INTERVAL', 0.005)
+    app.config.setdefault('PROFILER_KEEP', 100)
+    app.config.setdefault('PROFILER_DIR', os.path.join(tempfile.gettempdir(), 'representacao-profiles'))
+    app.extensions['profiler'] = ProfileStore(app.config['PROFILER_DIR'], app.config['PROFILER_KEEP'])
+
+    @app.before_request
+    def start_profile():
+        rate = app.config['PROFILER_SAMPLE_RATE']
+        header = request.headers.get(PROFILE_HEADER)
+        if not rate and header is None:
+            return
+        if not (token_matches(app, header) or (rate and random.random() < rate)):
+            return
+        profiler = SamplingProfiler(threading.get_ident(), app.config['PROFILER_INTERVAL'])
+        g._profile = (profiler, perf_counter())
+        profiler.start()
+
+    @app.after_request
+    def finish_profile(response):
+        active = g.pop('_profile', None)
+        if active is None:
+            return response
+        profiler, started = active
+        stacks = profiler.stop()
+        meta = {
+            'id': uuid4().hex,
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'duration_ms': round((perf_counter() - started) * 1000, 2),
+            'samples': sum(stacks.values()),
+            'interval_ms': app.config['PROFILER_INTERVAL'] * 1000,
+            'pid': os.getpid(),
+            'created_at': datetime.utcnow().isoformat()
+        }
+        try:
+            app.extensions['profiler'].save(meta, stacks)
+            response.headers['X-Profile-Id'] = meta['id']
+        except OSError as e:
+            app.logger.warning('perfil não gravado: %s', e)
+        return response
+
+    @app.teardown_request
+    def abort_profile(exc):
+        # Requisições que terminaram em exceção não passam pelo after_request
+        active = g.pop('_profile', None)
+        if active is not None:
+            active[0].stop()
@@ -0,0 +1,197 @@
+from itertools import groupby, islice
+from operator import itemgetter
+from flask import current_app, request
+from sqlalchemy import select
+from src.models.models import db, Order, OrderItem, Client, PaymentMethod, Product, User, UserCompany
+
+# Linhas serializadas por chamada ao encoder JSON
+SERIALIZE_CHUNK = 1000
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _money(value):
+    return float(value) if value else 0
+
+
+class RowSchema:
+    """Colunas de um SELECT Core e como cada uma vira chave do JSON (mesmo formato de to_dict()).
+
+    As linhas ficam como Row (tuplas) do SQLAlchemy, sem instâncias ORM nem
+    identity map; o dicionário só é montado na hora de serializar.
+    """
+
+    __slots__ = ('keys', 'columns', 'converters')
+
+    def __init__(self, *fields):
+        self.keys = tuple(key for key, _, _ in fields)
+        self.columns = tuple(column for _, column, _ in fields)
+        self.converters = tuple(converter for _, _, converter in fields)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def to_dict(self, values):
+        return {
+            key: converter(value) if converter else value
+            for key, converter, value in zip(self.keys, self.converters, values)
+        }
+
+    def to_list(self, values):
+        """Valores na ordem de `keys`, para payloads em colunas (sem repetir as chaves por linha)"""
+        return [converter(value) if converter else value for converter, value in zip(self.converters, values)]
+
+
+def _timestamps(table):
+    return (('created_at', table.c.created_at, _iso), ('updated_at', table.c.updated_at, _iso))
+
+
+_users, _products = User.__table__, Product.__table__
+_clients, _payment_methods = Client.__table__, PaymentMethod.__table__
+_orders, _items = Order.__table__, OrderItem.__table__
+
+USER = RowSchema(('id', _users.c.id, None), ('email', _users.c.email, None), *_timestamps(_users))
+
+PRODUCT = RowSchema(
+    ('id', _products.c.id, None),
+    ('company_id', _products.c.company_id, None),
+    ('code', _products.c.code, None),
+    ('description', _products.c.description, None),
+    ('value', _products.c.value, _money),
+    ('sizes', _products.c.sizes, None),
+    *_timestamps(_products)
+)
+
+CLIENT = RowSchema(
+    ('id', _clients.c.id, None),
+    ('cnpj', _clients.c.cnpj, None),
+    ('razao_social', _clients.c.razao_social, None),
+    ('nome_fantasia', _clients.c.nome_fantasia, None),
+    *_timestamps(_clients)
+)
+
+PAYMENT_METHOD = RowSchema(
+    ('id', _payment_methods.c.id, None),
+    ('name', _payment_methods.c.name, None),
+    ('is_active', _payment_methods.c.is_active, None),
+    *_timestamps(_payment_methods)
+)
+
+ORDER = RowSchema(
+    ('id', _orders.c.id, None),
+    ('user_id', _orders.c.user_id, None),
+    ('company_id', _orders.c.company_id, None),
+    ('client_id', _orders.c.client_id, None),
+    ('payment_method_id', _orders.c.payment_method_id, None),
+    ('discount_percentage', _orders.c.discount_percentage, _money),
+    ('total_value', _orders.c.total_value, _money),
+    ('status', _orders.c.status, None),
+    ('order_date', _orders.c.order_date, _iso),
+    *_timestamps(_orders)
+)
+
+ORDER_ITEM = RowSchema(
+    ('id', _items.c.id, None),
+    ('order_id', _items.c.order_id, None),
+    ('product_id', _items.c.product_id, None),
+    ('quantity', _items.c.quantity, None),
+    ('unit_value', _items.c.unit_value, _money),
+    *_timestamps(_items)
+)
+
+
+def core_read_enabled():
+    """Indica se o endpoint atual está configurado para o caminho de leitura Core (CORE_READ_ENDPOINTS)"""
+    return request.endpoint in current_app.config.get('CORE_READ_ENDPOINTS', ())
+
+
+def json_array(rows, to_dict):
+    """Serializa as linhas em blocos num único buffer, sem materializar a lista inteira de dicionários"""
+    encode = current_app.json.dumps_bytes
+    rows = iter(rows)
+    body = bytearray(b'[')
+    while True:
+        chunk = [to_dict(row) for row in islice(rows, SERIALIZE_CHUNK)]
+        if not chunk:
+            break
+        if len(body) > 1:
+            body += b','
+        body += encode(chunk)[1:-1]
+    body += b']'
+    return body
+
+
+def json_response(body):
+    return current_app.response_class(body, mimetype='application/json')
+
+
+def _stream(stmt):
+    # yield_per: no Postgres usa cursor do lado do servidor; as linhas chegam em lotes
+    return db.session.execute(stmt, execution_options={'yield_per': SERIALIZE_CHUNK})
+
+
+def products_json(company_id):
+    return json_array(
+        _stream(select(*PRODUCT.columns).where(_products.c.company_id == company_id)),
+        PRODUCT.to_dict
+    )
+
+
+def users_json(company_id):
+    user_companies = UserCompany.__table__
+    return json_array(
+        _stream(
+            select(*USER.columns)
+            .join(user_companies, user_companies.c.user_id == _users.c.id)
+            .where(user_companies.c.company_id == company_id)
+        ),
+        USER.to_dict
+    )
+
+
+def orders_json(user_id, company_id):
+    """Lista de pedidos com cliente, forma de pagamento e itens/produtos.
+
+    Uma única consulta (pedidos com LEFT JOIN nos itens) lida em lotes e
+    agrupada por pedido enquanto é lida: pedidos e itens saem do mesmo
+    snapshot e só um bloco de linhas fica em memória.
+    """
+    rows = _stream(
+        select(*ORDER.columns, *CLIENT.columns, *PAYMENT_METHOD.columns, *ORDER_ITEM.columns, *PRODUCT.columns)
+        .select_from(
+            _orders.join(_clients, _clients.c.id == _orders.c.client_id)
+            .outerjoin(_payment_methods, _payment_methods.c.id == _orders.c.payment_method_id)
+            .outerjoin(_items, _items.c.order_id == _orders.c.id)
+            .outerjoin(_products, _products.c.id == _items.c.product_id)
+        )
+        .where(_orders.c.user_id == user_id, _orders.c.company_id == company_id)
+        .order_by(_orders.c.order_date.desc(), _orders.c.id.desc(), _items.c.id)
+    )
+
+    order_end = len(ORDER)
+    client_end = order_end + len(CLIENT)
+    payment_end = client_end + len(PAYMENT_METHOD)
+    item_end = payment_end + len(ORDER_ITEM)
+
+    def item_dict(row):
+        data = ORDER_ITEM.to_dict(row[payment_end:item_end])
+        data['product'] = PRODUCT.to_dict(row[item_end:])
+        return data
+
+    def grouped():
+        for _, order_rows in groupby(rows, key=itemgetter(0)):
+            yield list(order_rows)
+
+    def order_dict(order_rows):
+        row = order_rows[0]
+        data = ORDER.to_dict(row[:order_end])
+        data['client'] = CLIENT.to_dict(row[order_end:client_end])
+        payment_method = row[client_end:payment_end]
+        data['payment_method'] = PAYMENT_METHOD.to_dict(payment_method) if payment_method[0] is not None else None
+        # Pedido sem itens: uma linha com as colunas do item nulas
+        data['items'] = [item_dict(item) for item in order_rows if item[payment_end] is not None]
+        return data
+
+    return json_array(grouped(), order_dict)
@@ -0,0 +1,98 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from sqlalchemy import Integer, cast, func, select, true
+from src.models.models import db, Order, OrderItem, Product
+
+# Funções que expandem o JSON de quantidades em linhas (tamanho, quantidade) por dialeto
+JSON_EACH = {
+    'sqlite': 'json_each',
+    'postgresql': 'json_each_text'
+}
+
+
+def _item_filters(company_id, date_from=None, date_to=None, status=None):
+    filters = [Order.company_id == company_id]
+    if date_from:
+        filters.append(Order.order_date >= date_from)
+    if date_to:
+        filters.append(Order.order_date < date_to + timedelta(days=1))
+    if status:
+        filters.append(Order.status == status)
+    return filters
+
+
+def _aggregate_in_database(filters, json_each):
+    """(product_id, tamanho, unidades, valor) agregados pelo próprio banco"""
+    sizes = getattr(func, json_each)(OrderItem.quantity).table_valued('key', 'value', name='sizes')
+    units = cast(sizes.c.value, Integer)
+    stmt = (
+        select(OrderItem.product_id, sizes.c.key, func.sum(units), func.sum(units * OrderItem.unit_value))
+        .select_from(OrderItem)
+        .join(Order, Order.id == OrderItem.order_id)
+        .join(sizes, true())
+        .where(*filters)
+        .group_by(OrderItem.product_id, sizes.c.key)
+    )
+    return db.session.execute(stmt)
+
+
+def _aggregate_in_python(filters):
+    """Fallback para bancos sem função de expansão de JSON: agrega os itens em lotes"""
+    totals = defaultdict(lambda: [0, Decimal('0')])
+    stmt = (
+        select(OrderItem.product_id, OrderItem.quantity, OrderItem.unit_value)
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(*filters)
+    )
+    for product_id, quantity, unit_value in db.session.execute(stmt, execution_options={'yield_per': 5000}):
+        for size, units in (quantity or {}).items():
+            entry = totals[(product_id, size)]
+            entry[0] += units
+            entry[1] += unit_value * units
+    return [(product_id, size, units, value) for (product_id, size), (units, value) in totals.items()]
+
+
+def size_grid(company_id, date_from=None, date_to=None, status=None):
+    """Matriz produto × tamanho com unidades e valor (bruto, sem desconto do pedido) vendidos.
+
+    O tamanho segue a grade cadastrada no produto; tamanhos fora da grade vão ao final.
+    """
+    filters = _item_filters(company_id, date_from, date_to, status)
+    json_each = JSON_EACH.get(db.session.get_bind(mapper=OrderItem).dialect.name)
+    rows = _aggregate_in_database(filters, json_each) if json_each else _aggregate_in_python(filters)
+
+    cells = defaultdict(dict)
+    for product_id, size, units, value in rows:
+        if units:
+            cells[product_id][size] = (int(units), float(value or 0))
+
+    products = Product.query.filter(Product.id.in_(list(cells))).order_by(Product.code).all() if cells else []
+
+    grid_sizes = []
+    seen = set()
+    report = []
+    for product in products:
+        product_cells = cells[product.id]
+        ordered = [size for size in (product.sizes or []) if size in product_cells]
+        ordered += sorted(size for size in product_cells if size not in ordered)
+        for size in ordered:
+            if size not in seen:
+                seen.add(size)
+                grid_sizes.append(size)
+        report.append({
+            'product_id': product.id,
+            'code': product.code,
+            'description': product.description,
+            'sizes': {size: {'units': product_cells[size][0], 'value': round(product_cells[size][1], 2)}
+                      for size in ordered},
+            'total_units': sum(units for units, _ in product_cells.values()),
+            'total_value': round(sum(value for _, value in product_cells.values()), 2)
+        })
+
+    return {
+        'sizes': grid_sizes,
+        'products': report,
+        'total_units': sum(entry['total_units'] for entry in report),
+        'total_value': round(sum(entry['total_value'] for entry in report), 2)
+    }
@@ -0,0 +1,29 @@
+import unicodedata
+from sqlalchemy import and_
+
+
+def prefix_upper_bound(prefix):
+    """Menor string maior que todas as que começam com `prefix`"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def prefix_range(column, prefix):
+    """Filtro de prefixo como intervalo (>= e <), atendido por range scan em qualquer banco.
+
+    Diferente de LIKE 'x%', não depende de collation para usar o índice.
+    """
+    return and_(column >= prefix, column < prefix_upper_bound(prefix))
+
+
+def only_digits(value):
+    """Mantém só os dígitos (CNPJ formatado ou não)"""
+    return ''.join(ch for ch in value or '' if ch.isdigit())
+
+
+def normalize_name(value):
+    """Forma de busca de nomes: sem acentos, maiúscula e com espaços colapsados"""
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', value)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.upper().split())
@@ -0,0 +1,313 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import ForeignKeyConstraint, MetaData, delete, insert, select, update
+from src.models.models import (
+    db, CompanyShard, Client, Product, Order, OrderItem, ArchivedOrder, ArchivedOrderItem, OrderEvent
+)
+from src.models.migrations import max_id, raise_id_sequence, run_migrations
+from src.services.db_routing import REPLICA_BIND, SHARDED_TABLES, shard_scope
+
+# Tabelas pequenas replicadas em cada shard (mesmos ids do principal) para os joins com pedidos ficarem locais
+REFERENCE_TABLES = ('payment_methods',)
+
+DEFAULT_MAP_TTL_SECONDS = 30
+COPY_BATCH_SIZE = 1000
+
+
+def parse_shard_binds(value):
+    """'shard_a=sqlite:///a.db,shard_b=postgresql://...' -> {'shard_a': uri, 'shard_b': uri}"""
+    binds = {}
+    for entry in filter(None, (part.strip() for part in (value or '').split(','))):
+        key, _, uri = entry.partition('=')
+        key, uri = key.strip(), uri.strip()
+        if not key or not uri or key == REPLICA_BIND:
+            raise ValueError(f'SHARD_BINDS inválido: {entry!r}')
+        binds[key] = uri
+    return binds
+
+
+class ShardMap:
+    """Mapa company_id -> shard lido de company_shards e mantido em memória por SHARD_MAP_TTL_SECONDS.
+
+    Depois de uma mudança no mapa, outros processos seguem com o valor anterior
+    até o TTL expirar; move_company espera esse tempo antes de apagar a origem.
+    """
+
+    def __init__(self):
+        self._binds = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _stale(self):
+        ttl = current_app.config.get('SHARD_MAP_TTL_SECONDS', DEFAULT_MAP_TTL_SECONDS)
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > ttl
+
+    def get(self, company_id):
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    table = CompanyShard.__table__
+                    with db.engine.connect() as conn:
+                        self._binds = dict(conn.execute(select(table.c.company_id, table.c.bind_key)).all())
+                    self._loaded_at = time.monotonic()
+        return self._binds.get(company_id)
+
+    def invalidate(self):
+        self._loaded_at = None
+
+
+shard_map = ShardMap()
+
+
+def shard_bind_for(company_id):
+    """Shard da empresa, ou None quando ela fica no banco principal (ou não há SHARD_BINDS)"""
+    shard_binds = current_app.config.get('SHARD_BINDS')
+    if company_id is None or not shard_binds:
+        return None
+    bind_key = shard_map.get(company_id)
+    if bind_key is not None and bind_key not in shard_binds:
+        raise LookupError(f'Empresa {company_id} mapeada para o shard {bind_key!r}, ausente de SHARD_BINDS')
+    return bind_key
+
+
+def _engine(bind_key):
+    return db.engines[bind_key] if bind_key else db.engine
+
+
+def shard_engine(company_id):
+    """Engine com os pedidos da empresa (para código que usa conexões Core diretamente)"""
+    return _engine(shard_bind_for(company_id))
+
+
+def data_engines():
+    """Banco principal e todos os shards, para manutenções que percorrem todas as empresas"""
+    return [db.engine] + [db.engines[key] for key in current_app.config.get('SHARD_BINDS', {})]
+
+
+@contextmanager
+def tenant_scope(company_id):
+    """Fixa o shard da empresa para a sessão fora de requisições (jobs, scripts)"""
+    token = shard_scope.set((company_id, shard_bind_for(company_id)))
+    try:
+        yield
+    finally:
+        shard_scope.reset(token)
+
+
+# Schema dos shards
+
+def shard_metadata():
+    """Tabelas de um shard: por empresa e de referência, sem FKs para tabelas que só existem no principal"""
+    metadata = MetaData()
+    for name in (*REFERENCE_TABLES, *sorted(SHARDED_TABLES)):
+        db.metadata.tables[name].to_metadata(metadata)
+    for table in metadata.tables.values():
+        for constraint in [c for c in table.constraints if isinstance(c, ForeignKeyConstraint)]:
+            if constraint.elements[0].target_fullname.split('.')[0] not in metadata.tables:
+                table.constraints.discard(constraint)
+                for element in constraint.elements:
+                    element.parent.foreign_keys.discard(element)
+                    table.foreign_keys.discard(element)
+    return metadata
+
+
+def sync_reference_tables(engines=None):
+    """Copia do principal para os shards as linhas novas ou alteradas das tabelas de referência"""
+    engines = data_engines()[1:] if engines is None else engines
+    if not engines:
+        return
+    with db.engine.connect() as conn:
+        snapshots = {
+            name: [dict(row) for row in conn.execute(select(db.metadata.tables[name])).mappings()]
+            for name in REFERENCE_TABLES
+        }
+    for engine in engines:
+        with engine.begin() as conn:
+            for name, rows in snapshots.items():
+                table = db.metadata.tables[name]
+                existing = {row['id']: dict(row) for row in conn.execute(select(table)).mappings()}
+                missing = [row for row in rows if row['id'] not in existing]
+                if missing:
+                    conn.execute(insert(table), missing)
+                for row in rows:
+                    if row['id'] in existing and existing[row['id']] != row:
+                        conn.execute(update(table).where(table.c.id == row['id']).values(row))
+
+
+def prepare_shards():
+    """Cria o schema (e aplica as migrações) de cada shard de SHARD_BINDS e sincroniza as referências"""
+    shard_binds = current_app.config.get('SHARD_BINDS', {})
+    if not shard_binds:
+        return
+    metadata = shard_metadata()
+    engines = [db.engines[key] for key in shard_binds]
+    for engine in engines:
+        metadata.create_all(engine)
+        run_migrations(engine)
+    sync_reference_tables(engines)
+
+
+# Mudança de shard
+
+def _colliding_ids(src, dst, table, where, targets, batch_size=COPY_BATCH_SIZE):
+    """Ids da origem que já existem em alguma das tabelas `targets` do destino"""
+    colliding = set()
+    result = src.execution_options(yield_per=batch_size).execute(select(table.c.id).where(where))
+    for ids in result.scalars().partitions():
+        for target in targets:
+            colliding.update(dst.execute(select(target.c.id).where(target.c.id.in_(ids))).scalars())
+    return sorted(colliding)
+
+
+def _copy_rows(src, dst, table, where, remap=None, batch_size=COPY_BATCH_SIZE):
+    """Copia as linhas em lotes mantendo os ids; devolve quantas foram copiadas"""
+    copied = 0
+    result = src.execution_options(yield_per=batch_size).execute(select(table).where(where).order_by(table.c.id))
+    for rows in result.mappings().partitions():
+        values = [dict(row) for row in rows]
+        if remap:
+            for row in values:
+                remap(row)
+        dst.execute(insert(table), values)
+        copied += len(values)
+    return copied
+
+
+def _copy_clients(src, dst, client_ids, batch_size=COPY_BATCH_SIZE):
+    """Clientes são compartilhados entre empresas: no destino reaproveita o cliente de mesmo CNPJ"""
+    clients = Client.__table__
+    ids = {}
+    client_ids = sorted(client_ids)
+    for start in range(0, len(client_ids), batch_size):
+        rows = src.execute(select(clients).where(clients.c.id.in_(client_ids[start:start + batch_size]))).mappings().all()
+        existing = dict(dst.execute(
+            select(clients.c.cnpj, clients.c.id).where(clients.c.cnpj.in_([row['cnpj'] for row in rows]))
+        ).all())
+        missing = []
+        for row in rows:
+            if row['cnpj'] in existing:
+                ids[row['id']] = existing[row['cnpj']]
+            else:
+                missing.append(row)
+        if missing:
+            new_ids = dst.execute(
+                insert(clients).returning(clients.c.id, sort_by_parameter_order=True),
+                [{key: value for key, value in row.items() if key != 'id'} for row in missing]
+            ).scalars().all()
+            ids.update(zip((row['id'] for row in missing), new_ids))
+    return ids
+
+
+def move_company(company_id, target_bind, batch_size=COPY_BATCH_SIZE, settle_seconds=None):
+    """Move produtos, pedidos, itens, arquivo e eventos da empresa para `target_bind` (None = principal).
+
+    A cópia vai para o destino numa única transação, com os mesmos ids: links
+    para pedidos (inclusive arquivados) e cursores do feed de alterações
+    continuam valendo. Se algum id já existir no destino a mudança é abortada
+    antes de gravar qualquer linha. Só depois o mapa aponta para o destino e,
+    passado o TTL do mapa, a origem é apagada. Clientes são compartilhados
+    entre empresas: no destino é usado o cliente de mesmo CNPJ (ou uma cópia
+    com id novo) e a origem os mantém. As escritas da empresa devem estar
+    pausadas durante a mudança.
+    """
+    shard_binds = current_app.config.get('SHARD_BINDS', {})
+    if target_bind is not None and target_bind not in shard_binds:
+        raise ValueError(f'Shard {target_bind!r} não está em SHARD_BINDS')
+    shard_map.invalidate()
+    source_bind = shard_bind_for(company_id)
+    if source_bind == target_bind:
+        raise ValueError(f'Empresa {company_id} já está em {target_bind or "principal"}')
+    source, target = _engine(source_bind), _engine(target_bind)
+    if target_bind is not None:
+        sync_reference_tables([target])
+
+    products, orders, items = Product.__table__, Order.__table__, OrderItem.__table__
+    archived, archived_items = ArchivedOrder.__table__, ArchivedOrderItem.__table__
+    events = OrderEvent.__table__
+    company_orders = select(orders.c.id).where(orders.c.company_id == company_id)
+    company_archived = select(archived.c.id).where(archived.c.company_id == company_id)
+
+    # (tabela, filtro na origem, tabelas do destino onde o id não pode existir)
+    copies = [
+        (products, products.c.company_id == company_id, (products,)),
+        (orders, orders.c.company_id == company_id, (orders, archived)),
+        (archived, archived.c.company_id == company_id, (orders, archived)),
+        (items, items.c.order_id.in_(company_orders), (items, archived_items)),
+        (archived_items, archived_items.c.order_id.in_(company_archived), (items, archived_items)),
+        (events, events.c.company_id == company_id, (events,))
+    ]
+
+    with source.connect() as src, target.begin() as dst:
+        collisions = []
+        for table, where, targets in copies:
+            ids = _colliding_ids(src, dst, table, where, targets, batch_size)
+            if ids:
+                collisions.append(f'{table.name}: {ids[:10]}')
+        if collisions:
+            raise ValueError(
+                f'Mudança da empresa {company_id} abortada: ids já existentes em '
+                f'{target_bind or "principal"} ({"; ".join(collisions)})'
+            )
+
+        client_ids = _copy_clients(src, dst, src.execute(
+            select(orders.c.client_id).where(orders.c.company_id == company_id)
+            .union(select(archived.c.client_id).where(archived.c.company_id == company_id))
+        ).scalars().all(), batch_size)
+
+        def remap_client(row):
+            row['client_id'] = client_ids[row['client_id']]
+
+        def remap_event(row):
+            payload = row['payload'] or {}
+            if payload.get('client_id') in client_ids:
+                row['payload'] = {**payload, 'client_id': client_ids[payload['client_id']]}
+
+        remaps = {orders.name: remap_client, archived.name: remap_client, events.name: remap_event}
+        counts = {
+            table.name: _copy_rows(src, dst, table, where, remaps.get(table.name), batch_size)
+            for table, where, _ in copies
+        }
+
+        # Ids explícitos não avançam a sequence do destino
+        raise_id_sequence(dst, products, max_id(dst, products))
+        raise_id_sequence(dst, orders, max_id(dst, orders, archived))
+        raise_id_sequence(dst, items, max_id(dst, items, archived_items))
+        raise_id_sequence(dst, events, max_id(dst, events))
+
+    shard_table = CompanyShard.__table__
+    with db.engine.begin() as conn:
+        conn.execute(delete(shard_table).where(shard_table.c.company_id == company_id))
+        if target_bind is not None:
+            conn.execute(insert(shard_table).values(
+                company_id=company_id, bind_key=target_bind, updated_at=datetime.utcnow()
+            ))
+    shard_map.invalidate()
+
+    # Outros processos podem ler o mapa antigo até o TTL expirar
+    if settle_seconds is None:
+        settle_seconds = current_app.config.get('SHARD_MAP_TTL_SECONDS', DEFAULT_MAP_TTL_SECONDS)
+    time.sleep(settle_seconds)
+
+    with source.begin() as conn:
+        conn.execute(delete(items).where(items.c.order_id.in_(company_orders)))
+        conn.execute(delete(archived_items).where(archived_items.c.order_id.in_(company_archived)))
+        conn.execute(delete(orders).where(orders.c.company_id == company_id))
+        conn.execute(delete(archived).where(archived.c.company_id == company_id))
+        conn.execute(delete(events).where(events.c.company_id == company_id))
+        conn.execute(delete(products).where(products.c.company_id == company_id))
+
+    return {
+        'company_id': company_id,
+        'from': source_bind,
+        'to': target_bind,
+        'products': counts['products'],
+        'clients': len(client_ids),
+        'orders': counts['orders'],
+        'items': counts['order_items'],
+        'archived_orders': counts['archived_orders'],
+        'archived_items': counts['archived_order_items'],
+        'events': counts['order_events']
+    }
@@ -0,0 +1,157 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from flask import Response, request
+from werkzeug.wsgi import wrap_file
+from src.services.compression import COMPRESSIBLE_MIMETYPES, brotli
+
+# Nomes gerados pelo build do Vite: index-DzGM1iOc.js, logo-4f9a1c2e.svg. O hash tem
+# exatamente 8 caracteres base64url, depois de um hífen; exigir um dígito evita
+# casar com palavras comuns (app-settings.json), ao custo de alguns hashes só com letras
+HASHED_NAME = re.compile(r'-(?=[A-Za-z0-9_-]{0,7}[0-9])[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$')
+
+# Manifest do build (vite build --manifest): quando existe, é a lista exata dos arquivos com hash
+BUILD_MANIFESTS = ('.vite/manifest.json', 'manifest.json')
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+# Variantes pré-comprimidas aceitas ao lado do arquivo original
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+
+class StaticAsset:
+    """Arquivo do build com ETag e variantes comprimidas calculadas na inicialização"""
+
+    __slots__ = ('path', 'mimetype', 'etag', 'cache_control', 'bodies')
+
+    def __init__(self, path, mimetype, etag, cache_control, bodies):
+        self.path = path
+        self.mimetype = mimetype
+        self.etag = etag
+        self.cache_control = cache_control
+        # encoding ('identity', 'br', 'gzip') -> bytes em memória ou (caminho, tamanho)
+        self.bodies = bodies
+
+
+class StaticManifest:
+    """Índice da pasta estática montado uma vez; o caminho quente não consulta o sistema de arquivos.
+
+    Arquivos `.br`/`.gz` gerados no build são usados como variantes do original;
+    na falta deles, assets compressíveis são comprimidos em memória na montagem.
+    Só os arquivos com hash (pelo manifest do build ou pelo nome) recebem cache
+    imutável; os demais são revalidados pelo ETag.
+    Arquivos adicionados depois da inicialização só aparecem após reiniciar.
+    """
+
+    def __init__(self, folder, min_size=1024, inline_max=2 * 1024 * 1024):
+        self.folder = folder
+        self.min_size = min_size
+        self.inline_max = inline_max
+        self.assets = {}
+        self.hashed_files = None
+        if folder and os.path.isdir(folder):
+            self.hashed_files = self._read_build_manifest()
+            self._build()
+
+    def _read_build_manifest(self):
+        """Arquivos com hash listados no manifest do Vite, ou None quando o build não gerou um"""
+        for name in BUILD_MANIFESTS:
+            path = os.path.join(self.folder, name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, encoding='utf-8') as f:
+                entries = json.load(f)
+            hashed = set()
+            for entry in entries.values():
+                hashed.add(entry['file'])
+                hashed.update(entry.get('css', ()))
+                hashed.update(entry.get('assets', ()))
+            return hashed
+        return None
+
+    def _immutable(self, relative, name):
+        if self.hashed_files is not None:
+            return relative in self.hashed_files
+        return HASHED_NAME.search(name) is not None
+
+    def _build(self):
+        for root, _, files in os.walk(self.folder):
+            names = set(files)
+            for name in files:
+                if any(name.endswith(suffix) and name[:-len(suffix)] in names for _, suffix in PRECOMPRESSED):
+                    continue
+                full_path = os.path.join(root, name)
+                relative = os.path.relpath(full_path, self.folder).replace(os.sep, '/')
+                self.assets[relative] = self._load(full_path, name, names, self._immutable(relative, name))
+
+    def _body(self, path, size):
+        if size <= self.inline_max:
+            with open(path, 'rb') as f:
+                return f.read()
+        return (path, size)
+
+    def _load(self, full_path, name, siblings, immutable):
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if mimetype.startswith('text/'):
+            mimetype_header = f'{mimetype}; charset=utf-8'
+        else:
+            mimetype_header = mimetype
+
+        digest = hashlib.sha1()
+        with open(full_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        size = os.path.getsize(full_path)
+        bodies = {'identity': self._body(full_path, size)}
+
+        for encoding, suffix in PRECOMPRESSED:
+            if name + suffix in siblings:
+                variant = full_path + suffix
+                bodies[encoding] = self._body(variant, os.path.getsize(variant))
+
+        if mimetype in COMPRESSIBLE_MIMETYPES and size >= self.min_size and isinstance(bodies['identity'], bytes):
+            data = bodies['identity']
+            if 'gzip' not in bodies:
+                bodies['gzip'] = gzip.compress(data, compresslevel=9, mtime=0)
+            if 'br' not in bodies and brotli is not None:
+                bodies['br'] = brotli.compress(data, quality=11)
+
+        cache_control = IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE
+        return StaticAsset(full_path, mimetype_header, digest.hexdigest()[:20], cache_control, bodies)
+
+    def get(self, path):
+        return self.assets.get(path)
+
+
+def _choose_variant(asset):
+    accept = request.accept_encodings
+    if 'br' in asset.bodies and accept['br']:
+        return 'br'
+    if 'gzip' in asset.bodies and accept['gzip']:
+        return 'gzip'
+    return 'identity'
+
+
+def asset_response(asset):
+    """Resposta para um asset do manifest, com variante negociada, cache e ETag/304"""
+    encoding = _choose_variant(asset)
+    body = asset.bodies[encoding]
+    if isinstance(body, bytes):
+        response = Response(body, mimetype=asset.mimetype)
+    else:
+        path, size = body
+        response = Response(wrap_file(request.environ, open(path, 'rb')), mimetype=asset.mimetype,
+                            direct_passthrough=True)
+        response.content_length = size
+
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    if len(asset.bodies) > 1:
+        response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = asset.cache_control
+    response.set_etag(asset.etag if encoding == 'identity' else f'{asset.etag}-{encoding}')
+    return response.make_conditional(request)
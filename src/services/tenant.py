@@ -0,0 +1,16 @@
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from src.models.models import UserCompany
+from src.services.sharding import shard_bind_for
+
+
+def get_current_company_id():
+    """Empresa do usuário autenticado, resolvida uma vez por requisição (None sem associação).
+
+    Resolve também o shard da empresa, usado pela sessão para as tabelas por empresa.
+    """
+    if '_company_id' not in g:
+        user_company = UserCompany.query.filter_by(user_id=get_jwt_identity()).first()
+        g._company_id = user_company.company_id if user_company else None
+        g._shard_bind = shard_bind_for(g._company_id)
+    return g._company_id
@@ -0,0 +1,89 @@
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from src.models.models import db, Client, Product
+
+# INSERT com ON CONFLICT por dialeto; nos demais bancos cada linha vai num savepoint
+ON_CONFLICT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert
+}
+
+LOOKUP_CHUNK = 1000
+
+
+def insert_ignoring_conflicts(model, rows, conflict_columns, returning=()):
+    """INSERT das linhas ignorando as que violam a unicidade de `conflict_columns`, sem abortar a transação.
+
+    Com `returning`, devolve essas colunas das linhas efetivamente inseridas.
+    As linhas vão ordenadas pelas colunas de conflito: transações concorrentes
+    com chaves em comum pegam os locks do índice único na mesma ordem e não
+    entram em deadlock no Postgres.
+    """
+    if not rows:
+        return []
+    rows = sorted(rows, key=lambda row: tuple(row[column] for column in conflict_columns))
+    table = model.__table__
+    on_conflict_insert = ON_CONFLICT_INSERTS.get(db.session.get_bind(mapper=model).dialect.name)
+    if on_conflict_insert is not None:
+        stmt = on_conflict_insert(table).on_conflict_do_nothing(index_elements=conflict_columns)
+        if returning:
+            return db.session.execute(stmt.returning(*returning), rows).all()
+        db.session.execute(stmt, rows)
+        return []
+
+    inserted = []
+    for row in rows:
+        stmt = insert(table).values(row)
+        try:
+            with db.session.begin_nested():
+                result = db.session.execute(stmt.returning(*returning) if returning else stmt)
+                if returning:
+                    inserted.append(result.one())
+        except IntegrityError:
+            continue
+    return inserted
+
+
+def _in_chunks(values):
+    values = list(values)
+    for start in range(0, len(values), LOOKUP_CHUNK):
+        yield values[start:start + LOOKUP_CHUNK]
+
+
+def _clients_by_cnpj(cnpjs):
+    clients = {}
+    for chunk in _in_chunks(cnpjs):
+        clients.update((client.cnpj, client) for client in db.session.scalars(select(Client).where(Client.cnpj.in_(chunk))))
+    return clients
+
+
+def ensure_clients(entries):
+    """Clientes por CNPJ, criando os que faltam; entries: {cnpj: (razao_social, nome_fantasia)}.
+
+    Quem chega primeiro cria o cliente; pedidos concorrentes para o mesmo CNPJ
+    novo não falham na constraint, apenas passam a usar o cliente já criado.
+    Clientes existentes não são alterados.
+    """
+    clients = _clients_by_cnpj(entries)
+    missing = sorted(cnpj for cnpj in entries if cnpj not in clients)
+    if missing:
+        # INSERT Core não passa pelo before_insert do modelo: colunas de busca calculadas aqui
+        insert_ignoring_conflicts(Client, [
+            {'cnpj': cnpj, 'razao_social': entries[cnpj][0], 'nome_fantasia': entries[cnpj][1],
+             **Client.search_columns(cnpj, *entries[cnpj])}
+            for cnpj in missing
+        ], ['cnpj'])
+        clients.update(_clients_by_cnpj(missing))
+    return clients
+
+
+def products_by_code(company_id, codes):
+    """Produtos da empresa pelos códigos informados, em poucas consultas"""
+    products = {}
+    for chunk in _in_chunks({code for code in codes if isinstance(code, str)}):
+        products.update(
+            (product.code, product)
+            for product in Product.query.filter(Product.company_id == company_id, Product.code.in_(chunk))
+        )
+    return products